@@ -3,12 +3,9 @@ import sys
 import time
 import pyperclip
 import pyautogui
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
@@ -16,6 +13,31 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# The HTML analysis (document manifest) is shared with the Tistory skill
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "tistory_post", "scripts")))
+from document_manifest import load_manifest
+from browser_waits import StepTimer, Waiter
+from tag_entry import enter_tags
+from chrome_driver import start_chrome
+
+IMAGE_UPLOAD_TIMEOUT = 60
+
+# Image components of the SmartEditor body whose pictures finished loading
+LOADED_IMAGE_COUNT_JS = """
+return Array.prototype.filter.call(document.querySelectorAll('.se-main-container img'), function (img) {
+    return img.complete && img.naturalWidth > 0;
+}).length;
+"""
+
+# Text typed into the title component, without the '제목' placeholder span
+TITLE_TEXT_JS = """
+var title = arguments[0].cloneNode(true);
+Array.prototype.forEach.call(title.querySelectorAll('.se-placeholder'), function (placeholder) {
+    placeholder.parentNode.removeChild(placeholder);
+});
+return title.textContent.replace(/\\s+/g, ' ').trim();
+"""
+
 def set_clipboard_html(html_str, plain_str):
     """Copies HTML and Plain text directly to Windows Clipboard to retain formatting."""
     import ctypes
@@ -61,13 +83,30 @@ def set_clipboard_html(html_str, plain_str):
     
     user32.CloseClipboard()
 
-def safe_send_keys_clipboard(driver, element, text):
+def safe_send_keys_clipboard(driver, element, text, waits=None):
     """Fallback method using clipboard paste to bypass strict formatting or captcha."""
     element.click()
-    time.sleep(0.2)
     pyperclip.copy(text)
     webdriver.ActionChains(driver).key_down(Keys.CONTROL).send_keys("v").key_up(Keys.CONTROL).perform()
-    time.sleep(0.5)
+    if waits:
+        waits.until(lambda d: element.get_attribute("value"), 3)
+
+def wait_for_file_dialog(waits, opened, timeout=10):
+    """
+    Waits until the OS file dialog is (opened=True) or is no longer (opened=False) the
+    active window. Without window information (pyautogui lacks it off Windows), returns
+    after the old fixed delay.
+    """
+    get_title = getattr(pyautogui, "getActiveWindowTitle", None)
+    if get_title is None:
+        time.sleep(3 if opened else 1)
+        return True
+    browser_title = waits.driver.title
+    def dialog_state(_driver):
+        title = get_title() or ""
+        on_browser = "Chrome" in title or (browser_title and browser_title in title)
+        return on_browser != opened
+    return bool(waits.until(dialog_state, timeout))
 
 def main():
     if len(sys.argv) < 3:
@@ -103,83 +142,21 @@ def main():
     if not blog_name:
         blog_name = naver_id # Default to ID if not specified
 
-    # 2. Parse HTML and Hashtags
+    # 2. Load the document manifest (title + paste-ready blocks, parsed once and cached)
     print(f"Reading and parsing content from {html_file}...")
-    with open(html_file, "r", encoding="utf-8") as f:
-        soup = BeautifulSoup(f.read(), 'html.parser')
-
-    # Extract title
-    title = "AI Generated Blog Post"
-    h1 = soup.find('h1')
-    if h1:
-        title = h1.get_text().strip()
-        h1.decompose()
-
-    # 1. Force black color on all general text blocks to prevent style bleeding
-    for tag in soup.find_all(['p', 'li', 'h2', 'h3', 'h4', 'blockquote']):
-        existing_style = tag.get('style', '')
-        # Only add black if color not already set (unlikely here but safe)
-        if 'color' not in existing_style.lower():
-            tag['style'] = f"color: #000000; {existing_style}".strip()
-
-    # 2. Apply blue color to important phrases (bold text)
-    for bold in soup.find_all(['b', 'strong']):
-        existing_style = bold.get('style', '')
-        bold['style'] = f"color: #0054FF; font-weight: bold; {existing_style}".strip()
-
-    # Extract body blocks (html chunks, img blocks)
+    manifest = load_manifest(html_file)
+    title = manifest["title"] or "AI Generated Blog Post"
+
     blocks = []
-    current_html_chunk = []
-    
-    # Process children of body if exists, else descendants
-    root = soup.body if soup.body else soup
-    
-    # We want to split the content into HTML chunks and Image paths
-    # Crucial: We must REMOVE the <img> tags from the HTML chunks so we don't paste local paths
-    for element in root.children:
-        if element.name is None:
-            # Just text or whitespace
-            if str(element).strip():
-                current_html_chunk.append(str(element))
-            continue
-            
-        # Find all images in this top-level element (e.g., inside a <figure> or <p>)
-        img_tags = element.find_all('img')
-        if element.name == 'img':
-            img_tags = [element]
-            
-        if img_tags:
-            # 1. Save any pending HTML before this image-containing element
-            if current_html_chunk:
-                blocks.append(('html', "".join(current_html_chunk)))
-                current_html_chunk = []
-            
-            # 2. Extract image paths and remove the tags
-            for img in img_tags:
-                src = img.get('src')
-                if src and not src.startswith('http') and not src.startswith('//'):
-                    # Check if file exists relative to result folder
-                    img_abs_path = os.path.abspath(os.path.join(result_folder, src))
-                    if os.path.exists(img_abs_path):
-                        blocks.append(('img', src))
-                        print(f"Added image block: {src}")
-                    else:
-                        print(f"Warning: Image file not found: {img_abs_path}")
-                
-                # Remove the img tag so it's not pasted as a broken local link
-                img.decompose()
-            
-            # 3. If there's remaining content in the element (like a <figcaption>), append it
-            # We strip it to see if it's just empty tags now
-            element_str = str(element)
-            if BeautifulSoup(element_str, 'html.parser').get_text().strip():
-                current_html_chunk.append(element_str)
-        else:
-            # No images here, just add the whole element to the current chunk
-            current_html_chunk.append(str(element))
-
-    if current_html_chunk:
-        blocks.append(('html', "".join(current_html_chunk)))
+    for block in manifest["blocks"]:
+        if block["type"] == "img":
+            # Check if file exists relative to result folder
+            img_abs_path = os.path.abspath(os.path.join(result_folder, block["src"]))
+            if not os.path.exists(img_abs_path):
+                print(f"Warning: Image file not found: {img_abs_path}")
+                continue
+            print(f"Added image block: {block['src']}")
+        blocks.append(block)
 
     print(f"Total content blocks detected: {len(blocks)}", flush=True)
     if not blocks:
@@ -193,17 +170,18 @@ def main():
             hashtags = f.read().strip().replace("#", "").replace(" ", ", ")
 
     # 3. Setup Selenium
+    timer = StepTimer()
+    timer.start("browser start")
     print("Starting Chrome Driver...", flush=True)
-    options = webdriver.ChromeOptions()
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--start-maximized")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.127 Safari/537.36")
-
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    # Windowed: the image upload drives the OS file dialog and the Windows clipboard
+    driver = start_chrome(
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.127 Safari/537.36",
+    )
+    waits = Waiter(driver, timer)
 
     try:
         # 4. Login to Naver
+        timer.start("login", replaced_sleep=4.4)
         login_url = "https://nid.naver.com/nidlogin.login"
         print(f"Navigating to {login_url}...", flush=True)
         driver.get(login_url)
@@ -217,10 +195,10 @@ def main():
             # Use clipboard paste to bypass captcha
             print("Login form detected. Logging in via clipboard paste bypass...", flush=True)
             id_input = driver.find_element(By.ID, "id")
-            safe_send_keys_clipboard(driver, id_input, naver_id)
+            safe_send_keys_clipboard(driver, id_input, naver_id, waits)
 
             pw_input = driver.find_element(By.ID, "pw")
-            safe_send_keys_clipboard(driver, pw_input, naver_pw)
+            safe_send_keys_clipboard(driver, pw_input, naver_pw, waits)
 
             driver.find_element(By.ID, "log.login").click()
             
@@ -230,13 +208,14 @@ def main():
         except TimeoutException:
             print("Login form not found. Assuming already logged in or redirected.", flush=True)
 
-        time.sleep(3) # Let sessions set
+        waits.network_idle(timeout=10) # Let sessions set
 
         # 5. Go to Write Page
+        timer.start("write page", replaced_sleep=2)
         write_url = f"https://blog.naver.com/{blog_name}?Redirect=Write"
         print(f"Navigating to write page: {write_url}...", flush=True)
         driver.get(write_url)
-        time.sleep(2)
+        waits.network_idle(timeout=15)
 
         # 5. Handle initial popups / Help panels
         print("Handling initial popups and editor loading...", flush=True)
@@ -260,7 +239,7 @@ def main():
                         if btn.is_displayed():
                             btn.click()
                             print(f"  Handled popup using: {sel}", flush=True)
-                            time.sleep(1)
+                            waits.until(lambda d: not btn.is_displayed(), 2)
                 except: continue
 
         # 1st try in default context
@@ -278,25 +257,27 @@ def main():
         close_popups()
 
         # 6. Title Input
+        timer.start("title", replaced_sleep=4)
         print("Setting title...", flush=True)
         try:
             title_container = WebDriverWait(driver, 20).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, ".se-documentTitle"))
             )
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", title_container)
-            time.sleep(1)
             
             try:
                 placeholder = title_container.find_element(By.CSS_SELECTOR, "span.se-placeholder")
                 placeholder.click()
             except:
                 title_container.click()
-            time.sleep(1)
 
             pyperclip.copy(title)
             webdriver.ActionChains(driver).key_down(Keys.CONTROL).send_keys("v").key_up(Keys.CONTROL).perform()
-            time.sleep(1)
-            print("Title set successfully.", flush=True)
+            expected_title = " ".join(title.split())
+            if waits.until(lambda d: d.execute_script(TITLE_TEXT_JS, title_container) == expected_title, 5):
+                print("Title set successfully.", flush=True)
+            else:
+                print(f"Warning: Title not confirmed after paste (editor shows '{driver.execute_script(TITLE_TEXT_JS, title_container)}').", flush=True)
 
             print("Moving focus to body...", flush=True)
             try:
@@ -308,18 +289,20 @@ def main():
                     main_container.click()
                 except:
                     webdriver.ActionChains(driver).send_keys(Keys.ENTER).perform()
-            time.sleep(1)
+            waits.dom_idle()
         except Exception as e:
             print(f"Warning: Title input failed: {e}", flush=True)
 
         # 7. Body Input Block by Block
         block_count = len(blocks)
+        image_count = sum(1 for block in blocks if block["type"] == "img")
+        timer.start("body blocks", replaced_sleep=3 + 3.5 * (block_count - image_count) + 23 * image_count)
         print(f"Typing body content (Total {block_count} blocks)...", flush=True)
-        time.sleep(1)
         
         actions = webdriver.ActionChains(driver)
 
-        for i, (block_type, content) in enumerate(blocks):
+        for i, block in enumerate(blocks):
+            block_type = block["type"]
             print(f"\n[BLOCK {i+1}/{block_count}] Type: {block_type}", flush=True)
             
             if block_type == 'html':
@@ -331,38 +314,34 @@ def main():
                     print(f"  Warning: Context switch to mainFrame failed: {e}", flush=True)
 
                 try:
-                    plain_text = BeautifulSoup(content, 'html.parser').get_text()
-                    set_clipboard_html(content, plain_text)
+                    set_clipboard_html(block["html"], block["text"])
                 except Exception as e:
                     print(f"  Clipboard HTML set failed, fallback to plain: {e}", flush=True)
-                    pyperclip.copy(BeautifulSoup(content, 'html.parser').get_text())
+                    pyperclip.copy(block["text"])
                 
-                # Use actions with a small delay
+                # Paste, then let the editor finish converting it before touching the clipboard again
                 actions.key_down(Keys.CONTROL).send_keys("v").key_up(Keys.CONTROL).perform()
-                time.sleep(1.5)
+                waits.dom_idle()
                 
                 # Reset style chain to black by pasting a reset div
                 try:
                     set_clipboard_html('<div style="color:#000000; font-family:inherit;">&nbsp;</div>', " ")
                     actions.key_down(Keys.CONTROL).send_keys("v").key_up(Keys.CONTROL).perform()
-                    time.sleep(0.5)
+                    waits.dom_idle(quiet=0.2)
                 except: pass
 
                 # Spacing
-                actions.send_keys(Keys.ENTER).perform()
-                time.sleep(0.5)
-                actions.send_keys(Keys.ENTER).perform()
-                time.sleep(1)
+                actions.send_keys(Keys.ENTER).send_keys(Keys.ENTER).perform()
+                waits.dom_idle(quiet=0.2)
 
             elif block_type == 'img':
-                abs_path = os.path.abspath(os.path.join(result_folder, content))
+                abs_path = os.path.abspath(os.path.join(result_folder, block["src"]))
                 if os.path.exists(abs_path):
                     uploaded = False
                     
                     # METHOD: UI Click + PyAutoGUI
                     try:
                         driver.maximize_window()
-                        time.sleep(1)
                         
                         # 1. Broad Search for the Photo Button
                         print(f"  [IMAGE UPLOAD] Searching for Photo button to upload: {abs_path}", flush=True)
@@ -391,6 +370,12 @@ def main():
                                 except: continue
                             return None
 
+                        # Upload-complete marker: one more loaded image in the editor body,
+                        # counted in mainFrame like the check after the upload
+                        driver.switch_to.default_content()
+                        driver.switch_to.frame("mainFrame")
+                        images_before = driver.execute_script(LOADED_IMAGE_COUNT_JS)
+
                         # Step A: Try Default Content
                         driver.switch_to.default_content()
                         photo_btn = find_button()
@@ -421,33 +406,35 @@ def main():
 
                         print(f"  Found Photo button! Clicking to trigger OS dialog...", flush=True)
                         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", photo_btn)
-                        time.sleep(1)
                         
                         # Use JS click to trigger the dialog
                         driver.execute_script("arguments[0].click();", photo_btn)
                         
                         # 3. Handle OS File Dialog
                         print("  Handling OS File Dialog (PyAutoGUI)...", flush=True)
-                        time.sleep(3) 
+                        if not wait_for_file_dialog(waits, opened=True):
+                            print("  Warning: File dialog not detected; typing the path anyway.", flush=True)
                         try:
                             pyautogui.hotkey('alt', 'n')
-                            time.sleep(0.5)
                             pyautogui.press('backspace', presses=80)
-                            time.sleep(0.5)
                             pyperclip.copy(abs_path)
                             pyautogui.hotkey('ctrl', 'v')
-                            time.sleep(1)
                             pyautogui.press('enter')
                             print("  Path sent to dialog.", flush=True)
                         except Exception as e:
                             print(f"  !!! PyAutoGUI interaction failed: {e}", flush=True)
                             sys.exit(1)
+                        wait_for_file_dialog(waits, opened=False)
 
                         # 4. Success verification (Wait for rendering)
-                        print("  Waiting 15s for Naver to render the image block...", flush=True)
-                        time.sleep(15)
+                        print(f"  Waiting for Naver to render the image block (up to {IMAGE_UPLOAD_TIMEOUT}s)...", flush=True)
+                        driver.switch_to.default_content()
+                        driver.switch_to.frame("mainFrame")
+                        if waits.until(lambda d: d.execute_script(LOADED_IMAGE_COUNT_JS) > images_before, IMAGE_UPLOAD_TIMEOUT):
+                            print("  Image upload finalized.", flush=True)
+                        else:
+                            print("  Warning: Image block not confirmed within timeout.", flush=True)
                         uploaded = True
-                        print("  Image upload finalized.", flush=True)
                         
                     except Exception as e:
                         print(f"  !!! CRITICAL UPLOAD FAILED: {e}", flush=True)
@@ -461,15 +448,17 @@ def main():
                             body = driver.find_element(By.CSS_SELECTOR, ".se-main-container")
                             body.click()
                             webdriver.ActionChains(driver).send_keys(Keys.ENTER).perform()
+                            waits.dom_idle(quiet=0.2)
                         except: pass
-                        time.sleep(1)
                 else:
                     print(f"  Warning: Local image missing: {abs_path}", flush=True)
 
         print("\nAll blocks processed. Finalizing post...", flush=True)
-        time.sleep(2)
+        waits.network_idle(timeout=10)
 
         # 8. PUBLISH PHASE
+        tag_list = [tag.strip() for tag in hashtags.split(',') if tag.strip()]
+        timer.start("publish", replaced_sleep=1 + 2 + 0.5 + 0.8 * len(tag_list) + 1 + 10 + 5)
         print("Starting Publish Phase...")
         try:
             # 8.1 Open Publish Menu
@@ -510,7 +499,6 @@ def main():
 
             print("Clicking initial Publish button to open menu...")
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", publish_config_btn)
-            time.sleep(1)
             driver.execute_script("arguments[0].click();", publish_config_btn)
             
             # 8.2 Wait for and Handle the Publish Layer
@@ -521,12 +509,12 @@ def main():
                     EC.visibility_of_element_located((By.CSS_SELECTOR, "div[data-focus-lock='publishLayer'], .publish_layer, .se-publish-config-layer"))
                 )
                 print("Publish layer detected.")
-                time.sleep(2)
+                waits.dom_idle()
             except:
                 print("Warning: Publish layer not detected via CSS, Proceeding with broad search.")
 
             # 8.3 Add Hashtags (Inside the layer)
-            if hashtags:
+            if tag_list:
                 print("Adding hashtags in publish menu...")
                 try:
                     # Look for the specific tag input provided by user
@@ -538,27 +526,34 @@ def main():
                         "input[placeholder*='태그']", 
                         ".se-tag-input"
                     ]
-                    for sel in tag_selectors:
-                        try:
-                            found = driver.find_elements(By.CSS_SELECTOR, sel)
-                            for f in found:
-                                if f.is_displayed():
-                                    tag_input = f; break
-                            if tag_input: break
-                        except: continue
+                    # First visible match, in one call
+                    tag_input = driver.execute_script("""
+                        for (var i = 0; i < arguments[0].length; i++) {
+                            var found = document.querySelectorAll(arguments[0][i]);
+                            for (var j = 0; j < found.length; j++) {
+                                if (found[j].offsetParent !== null) return found[j];
+                            }
+                        }
+                        return null;
+                    """, tag_selectors)
                     
                     if tag_input:
-                        tag_input.click()
-                        time.sleep(0.5)
-                        for tag in hashtags.split(','):
-                            tag = tag.strip()
-                            if tag:
-                                pyperclip.copy(tag)
-                                # Type the tag and press ENTER
-                                webdriver.ActionChains(driver).key_down(Keys.CONTROL).send_keys("v").key_up(Keys.CONTROL).perform()
-                                time.sleep(0.5)
-                                pyautogui.press('enter')
-                                time.sleep(0.3)
+                        # All tags in one script; chips are checked inside the publish layer
+                        missing = enter_tags(driver, waits, tag_input, tag_list, scope_selector="div[data-focus-lock='publishLayer'], .publish_layer, .se-publish-config-layer")
+                        if missing:
+                            print(f"  {len(missing)} tag chip(s) missing after bulk entry, typing them: {missing}")
+                            tag_input.click()
+                            tag_input.clear()
+                        else:
+                            print(f"  {len(tag_list)} hashtags added.")
+                        for tag in missing:
+                            pyperclip.copy(tag)
+                            # Type the tag and press ENTER
+                            webdriver.ActionChains(driver).key_down(Keys.CONTROL).send_keys("v").key_up(Keys.CONTROL).perform()
+                            waits.until(lambda d: tag_input.get_attribute("value"), 2)
+                            pyautogui.press('enter')
+                            # The input is emptied once the tag is registered
+                            waits.until(lambda d: not tag_input.get_attribute("value"), 2)
                     else:
                         print("Warning: Could not find hashtag input in the publish menu layer.")
                 except Exception as e:
@@ -573,7 +568,6 @@ def main():
                     if pb.is_displayed():
                         pb.click()
                         print("Selected 'Private' (비공개).")
-                        time.sleep(1)
                         break
             except Exception as e:
                 print(f"Warning: Private selection failed: {e}")
@@ -619,8 +613,11 @@ def main():
                 # Use JS click as it bypasses "element not interactable" or "intercepted" 
                 # which often happens in complex overlays
                 driver.execute_script("arguments[0].click();", final_publish_btn)
-                print(">> POST PUBLISHED SUCCESSFULLY (Private)!")
-                time.sleep(10)
+                # Publishing leaves the editor for the post view
+                if waits.until(lambda d: "Redirect=Write" not in d.current_url and "postwrite" not in d.current_url.lower(), 30):
+                    print(">> POST PUBLISHED SUCCESSFULLY (Private)!")
+                else:
+                    print(">> Publish clicked, but the editor did not close within 30s. Check the blog.")
             else:
                 print("Error: Could not find the final publish button in the layer.")
 
@@ -630,8 +627,8 @@ def main():
     except Exception as e:
         print(f"An error occurred: {e}")
     finally:
-        print("Script execution finished. Browser will close in 5 seconds.")
-        time.sleep(5)
+        timer.report()
+        print("Script execution finished. Closing browser.")
         try:
             driver.quit()
         except:
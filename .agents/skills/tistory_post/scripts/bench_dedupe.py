@@ -0,0 +1,101 @@
+"""
+Check + micro-benchmark for news_dedupe.cluster_news.
+
+Labeled cases first: same-outlet headlines about different stories must stay
+apart (also when a third outlet's item resembles both), while the same story
+from two outlets, or fetched twice from one outlet, must merge. Then the
+clustering is timed on the feeds in fixtures/rss/ (replayed at their
+<lastBuildDate>, see bench_rss_parser.py). Exits 1 if a labeled case fails.
+
+Usage: py bench_dedupe.py [feed.xml ...] [--repeat N]
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+from xml.sax.saxutils import escape
+
+from fetch_news import parse_news
+from news_dedupe import cluster_news, DEFAULT_THRESHOLD
+from bench_rss_parser import FIXTURE_DIR, feed_clock
+
+def news_item(headline, outlet, link):
+    """Google News-style item: " - Outlet" title suffix, description = linked headline + <font>outlet</font>."""
+    return {
+        "title": f"{headline} - {outlet}",
+        "link": link,
+        "pubDate": "Sat, 17 Oct 2026 07:00:00 GMT",
+        "description": escape(f'<a href="{link}" target="_blank">{headline}</a>&nbsp;&nbsp;<font color="#6f6f6f">{outlet}</font>'),
+    }
+
+# (name, items, expected clusters as lists of item indexes)
+CASES = [
+    ("same outlet, different stories", [
+        news_item("Microsoft earnings slows down", "The Wall Street Journal", "a"),
+        news_item("Intel earnings slows down", "The Wall Street Journal", "b"),
+    ], [[0], [1]]),
+    ("same outlet, different stories, bridged by another outlet", [
+        news_item("Microsoft earnings slows down", "The Wall Street Journal", "a"),
+        news_item("Nvidia earnings slows down", "Reuters", "b"),
+        news_item("Intel earnings slows down", "The Wall Street Journal", "c"),
+    ], [[0, 1], [2]]),
+    ("same outlet, different Korean stories", [
+        news_item("한은 기준금리 동결 전망", "연합뉴스", "a"),
+        news_item("정부 기준금리 동결 전망", "연합뉴스", "b"),
+    ], [[0], [1]]),
+    ("one story from two outlets", [
+        news_item("Nvidia AI chip export rules tightened by Commerce Department", "Reuters", "a"),
+        news_item("Nvidia AI chip export rules tightened by Commerce Department", "CNBC", "b"),
+    ], [[0, 1]]),
+    ("one story fetched twice from one outlet", [
+        news_item("코스피 외국인 순매도 지속", "한국경제", "a"),
+        news_item("코스피 외국인 순매도 지속", "한국경제", "b"),
+    ], [[0, 1]]),
+]
+
+def clusters_of(items, result):
+    """Maps cluster_news output back to lists of input indexes."""
+    index_by_link = {item["link"]: i for i, item in enumerate(items)}
+    return sorted(
+        [index_by_link[rep["link"]]] + [index_by_link[source["link"]] for source in rep.get("sources", [])]
+        for rep in result
+    )
+
+def check_cases():
+    failures = 0
+    for name, items, expected in CASES:
+        got = clusters_of(items, cluster_news(items, DEFAULT_THRESHOLD))
+        ok = got == sorted(expected)
+        failures += not ok
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}: {got}" + ("" if ok else f" (expected {sorted(expected)})"))
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time news_dedupe.cluster_news.")
+    parser.add_argument("feeds", nargs="*", help="RSS files to cluster (default: fixtures/rss/*.xml)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per feed (best is reported)")
+    args = parser.parse_args()
+
+    print("[Labeled cases]")
+    failures = check_cases()
+
+    print(f"\n{'fixture':<44} {'items':>6} {'clusters':>9} {'best ms':>8}")
+    for path in args.feeds or sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.xml"))):
+        with open(path, "rb") as f:
+            data = f.read()
+        items = parse_news(data, feed_clock(data))
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = cluster_news(items)
+            best = min(best, time.perf_counter() - start)
+        print(f"{os.path.basename(path)[:44]:<44} {len(items):>6} {len(result):>9} {best * 1000:>8.2f}")
+
+    if failures:
+        print(f"\n{failures} labeled case(s) failed.")
+        sys.exit(1)
+    print("\nAll labeled cases passed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Regression check + benchmark for the HTML parser backends (lxml vs. html.parser).
+
+Fixtures are the post templates in tistory_post/templates/, each scaled up to
+mega-content size (~35k characters) by repeating its body content (inside <body>,
+or the whole fragment after the leading comment) with renumbered images.
+For every fixture both backends must produce the same result for:
+  - hashtag insertion (hashtag_patch applied to the file),
+  - image src rewriting (src_patch for every image),
+  - Naver block splitting (manifest blocks),
+and the raw parse time and document manifest build time of each backend are reported.
+
+Usage: py bench_html_parser.py [template.html ...] [--target-chars N] [--repeat N]
+"""
+import os
+import re
+import sys
+import glob
+import time
+import argparse
+
+from html_backend import lxml_available, make_soup
+from document_manifest import build_manifest, hashtag_patch, src_patch, patch_text
+
+TEMPLATES_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "templates"))
+DEFAULT_TARGET_CHARS = 35000
+
+_IMAGE_NAME_RE = re.compile(r'image(\d+)\.(png|jpg|jpeg|webp)')
+_BODY_RE = re.compile(r'(<body\b[^>]*>)(.*)(</body>)', re.IGNORECASE | re.DOTALL)
+_LEADING_COMMENTS_RE = re.compile(r'^(?:\s*<!--.*?-->)*\s*', re.DOTALL)
+
+def scale_template(html, target_chars):
+    """
+    Repeats the template's body content until the document reaches target_chars, renumbering
+    imageN files so every copy has its own images. The document stays a single document:
+    one <html>/<body> and one header comment.
+    """
+    match = _BODY_RE.search(html)
+    if match:
+        prefix, body, suffix = html[:match.end(1)], match.group(2), match.group(3) + html[match.end(3):]
+    else:
+        header = _LEADING_COMMENTS_RE.match(html).end()
+        prefix, body, suffix = html[:header], html[header:], ""
+    copies = [body]
+    size = len(html)
+    copy_index = 1
+    while size < target_chars:
+        offset = copy_index * 100
+        copy = _IMAGE_NAME_RE.sub(lambda m: f"image{int(m.group(1)) + offset}.{m.group(2)}", body)
+        copies.append(copy)
+        size += len(copy)
+        copy_index += 1
+    return prefix + "\n".join(copies) + suffix
+
+def outputs(html, parser):
+    manifest = build_manifest(html, parser)
+    hashtags = patch_text(html, [hashtag_patch(manifest, "#경제 #주식 #A&B")])
+    flat_srcs = patch_text(html, [
+        src_patch(image, f"flat_{i}.png") for i, image in enumerate(manifest["images"]) if image["src"]
+    ])
+    return {"hashtag insertion": hashtags, "image src rewrite": flat_srcs, "naver blocks": manifest["blocks"]}
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def print_row(name, chars, times):
+    parse_stdlib, parse_lxml, manifest_stdlib, manifest_lxml = times
+    print(
+        f"{name[:30]:<30} {chars:>7} | {parse_stdlib * 1000:>16.1f} {parse_lxml * 1000:>8.1f} {parse_stdlib / parse_lxml:>7.2f}x"
+        f" | {manifest_stdlib * 1000:>19.1f} {manifest_lxml * 1000:>8.1f} {manifest_stdlib / manifest_lxml:>7.2f}x"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that lxml and html.parser give identical results and compare their speed.")
+    parser.add_argument("templates", nargs="*", help="Template files (default: all tistory_post/templates/*.html)")
+    parser.add_argument("--target-chars", type=int, default=DEFAULT_TARGET_CHARS, help="Scale every template up to this many characters")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per backend (best is reported)")
+    args = parser.parse_args()
+
+    if not lxml_available():
+        print("lxml is not installed; nothing to compare (pip install lxml).")
+        sys.exit(1)
+
+    paths = args.templates or sorted(glob.glob(os.path.join(TEMPLATES_DIR, "*.html")))
+    print(f"{'template':<30} {'chars':>7} | {'parse: stdlib ms':>16} {'lxml ms':>8} {'speedup':>8} | {'manifest: stdlib ms':>19} {'lxml ms':>8} {'speedup':>8}")
+    mismatches = 0
+    totals = [0.0, 0.0, 0.0, 0.0]
+    for path in paths:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            html = scale_template(f.read(), args.target_chars)
+        name = os.path.basename(path)
+
+        expected = outputs(html, "html.parser")
+        actual = outputs(html, "lxml")
+        for check, value in expected.items():
+            if actual[check] != value:
+                mismatches += 1
+                print(f"  MISMATCH in {name}: {check}")
+
+        times = [
+            best_time(lambda: make_soup(html, "html.parser"), args.repeat),
+            best_time(lambda: make_soup(html, "lxml"), args.repeat),
+            best_time(lambda: build_manifest(html, "html.parser"), args.repeat),
+            best_time(lambda: build_manifest(html, "lxml"), args.repeat),
+        ]
+        totals = [total + t for total, t in zip(totals, times)]
+        print_row(name, len(html), times)
+
+    print_row("total", "", totals)
+    if mismatches:
+        print(f"{mismatches} check(s) produced different output.")
+        sys.exit(1)
+    print("Hashtag insertion, image src rewriting and Naver blocks identical for both backends.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: local keyword engine (keyword_extractor.py) vs. Gemini hashtags.
+
+Fixtures are finished posts: every result/*/blog_post.html with a hashtags.txt next
+to it (the Gemini output it shipped with), or the HTML files given on the command
+line. For each post the local engine's latency and its overlap with the Gemini tags
+are reported. With --live, Gemini is also called (uncached) to time the API path.
+Labeled words are checked first (nouns that end like particles stay whole, modifiers
+and conjunctions are dropped); exits 1 if one fails.
+
+Usage: py bench_keywords.py [blog_post.html ...] [--count N] [--repeat N] [--live]
+"""
+import os
+import re
+import sys
+import glob
+import time
+import argparse
+
+from document_manifest import load_manifest
+from keyword_extractor import DEFAULT_TAG_COUNT, extract_keywords, attested_stems, normalize_word
+
+# (word, context text of the post, expected normalize_word result; None = not a keyword)
+WORD_CASES = [
+    ("우크라이나", "", "우크라이나"),
+    ("민주주의", "", "민주주의"),
+    ("자본주의", "", "자본주의"),
+    ("에세이", "", "에세이"),
+    ("디스플레이", "", "디스플레이"),
+    ("역효과", "", "역효과"),
+    ("전문가", "", "전문가"),
+    ("회의", "", "회의"),
+    ("마을", "", "마을"),
+    ("금리를", "", "금리"),
+    ("금리가", "금리 인상", "금리"),
+    ("우크라이나의", "", "우크라이나"),
+    ("새로운", "", None),
+    ("다양한", "", None),
+    ("포함된", "", None),
+    ("구체적인", "", None),
+    ("혹은", "", None),
+    ("식의", "", None),
+]
+
+def read_reference(html_path):
+    """Gemini hashtags stored next to the post, as a list without '#' ([] if none)."""
+    path = os.path.join(os.path.dirname(html_path), "hashtags.txt")
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [tag.lower() for tag in re.findall(r'#([^\s#,]+)', f.read())]
+
+def overlap(local, reference):
+    """Tags shared with the reference; a tag counts if one contains the other ('금리' ~ '금리인상')."""
+    return sum(1 for tag in local if any(tag in ref or ref in tag for ref in reference))
+
+def check_words():
+    failures = 0
+    for word, context, expected in WORD_CASES:
+        got, _ = normalize_word(word, attested_stems([context, word]))
+        ok = got == expected
+        failures += not ok
+        if not ok:
+            print(f"  FAIL normalize_word({word!r}): {got!r} (expected {expected!r})")
+    print(f"[Labeled words] {len(WORD_CASES) - failures}/{len(WORD_CASES)} ok")
+    return failures
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the local keyword engine with Gemini hashtags.")
+    parser.add_argument("posts", nargs="*", help="blog_post.html files (default: result/*/blog_post.html with a hashtags.txt)")
+    parser.add_argument("--count", type=int, default=DEFAULT_TAG_COUNT, help="Hashtags per post")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs of the local engine (best is reported)")
+    parser.add_argument("--live", action="store_true", help="Also request hashtags from Gemini and time the call")
+    args = parser.parse_args()
+
+    failures = check_words()
+    paths = args.posts or [
+        path for path in sorted(glob.glob(os.path.join("result", "*", "blog_post.html"))) if read_reference(path)
+    ]
+    if not paths:
+        print("No fixture posts found (result/*/blog_post.html with hashtags.txt); pass HTML files explicitly.")
+        sys.exit(1)
+
+    if args.live:
+        from generate_hashtags import build_digest, request_hashtags
+        from gemini_client import GeminiError
+
+    print(f"{'post':<40} {'chars':>7} | {'local ms':>8} {'gemini ms':>9} | {'overlap':>7}  local tags")
+    local_total = gemini_total = 0.0
+    shared_total = reference_total = 0
+    for path in paths:
+        manifest = load_manifest(path)
+        name = os.path.relpath(path)
+        keywords = extract_keywords(manifest, args.count)
+        local_time = best_time(lambda: extract_keywords(manifest, args.count), args.repeat)
+        local_total += local_time
+        local_tags = [keyword.lower() for keyword, _ in keywords]
+
+        reference = read_reference(path)
+        gemini_ms = "-"
+        if args.live:
+            start = time.perf_counter()
+            try:
+                hashtags, _ = request_hashtags(build_digest(manifest))
+            except GeminiError as e:
+                print(f"  Gemini request failed for {name}: {e}")
+            else:
+                elapsed = time.perf_counter() - start
+                gemini_total += elapsed
+                gemini_ms = f"{elapsed * 1000:.0f}"
+                reference = [tag.lower() for tag in re.findall(r'#([^\s#,]+)', hashtags)]
+
+        shared = overlap(local_tags, reference)
+        shared_total += shared
+        reference_total += min(len(reference), args.count)
+        overlap_text = f"{shared}/{min(len(reference), args.count)}" if reference else "-"
+        print(f"{name[-40:]:<40} {len(manifest['text']):>7} | {local_time * 1000:>8.1f} {gemini_ms:>9} | {overlap_text:>7}  {' '.join('#' + tag for tag in local_tags)}")
+
+    print(f"Local engine: {local_total * 1000 / len(paths):.1f} ms per post on average.")
+    if args.live and gemini_total:
+        print(f"Gemini: {gemini_total * 1000 / len(paths):.0f} ms per post on average.")
+    if reference_total:
+        print(f"Overlap with Gemini tags: {shared_total}/{reference_total} ({shared_total / reference_total:.0%}).")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
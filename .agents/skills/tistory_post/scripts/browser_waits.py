@@ -0,0 +1,159 @@
+"""
+Condition-based waits for the Selenium uploaders, and a per-step timing report.
+
+Each wait returns as soon as its condition holds (element present, DOM quiet, no
+requests in flight, editor probe true, ...) and gives up after a timeout instead
+of always sleeping for the worst case. Time spent waiting is booked on the
+current StepTimer step, so the report can compare it with the fixed sleeps the
+step used to have.
+"""
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+POLL_INTERVAL = 0.1
+
+# Resolves true once no DOM mutation (document + same-origin iframes) happened for `quiet` ms
+_DOM_IDLE_JS = """
+var quiet = arguments[0], timeout = arguments[1], done = arguments[arguments.length - 1];
+var docs = [document];
+Array.prototype.forEach.call(document.querySelectorAll('iframe'), function (frame) {
+    try { if (frame.contentDocument) docs.push(frame.contentDocument); } catch (e) {}
+});
+var observers = [], quietTimer = null, limitTimer = null;
+function finish(result) {
+    observers.forEach(function (observer) { observer.disconnect(); });
+    clearTimeout(quietTimer);
+    clearTimeout(limitTimer);
+    done(result);
+}
+function arm() {
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(function () { finish(true); }, quiet);
+}
+docs.forEach(function (doc) {
+    var observer = new MutationObserver(arm);
+    observer.observe(doc.documentElement || doc, {childList: true, subtree: true, attributes: true, characterData: true});
+    observers.push(observer);
+});
+limitTimer = setTimeout(function () { finish(false); }, timeout);
+arm();
+"""
+
+# True once the page is loaded, no XHR/fetch is pending and nothing was requested for `quiet` ms.
+# The XHR/fetch counter is installed on first use (once per document).
+_NETWORK_IDLE_JS = """
+var quiet = arguments[0];
+if (!window.__uploaderNet) {
+    var tracker = window.__uploaderNet = {pending: 0, last: Date.now(), resources: -1};
+    var touch = function () { tracker.last = Date.now(); };
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        tracker.pending++; touch();
+        this.addEventListener('loadend', function () { tracker.pending--; touch(); });
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            tracker.pending++; touch();
+            return originalFetch.apply(this, arguments).finally(function () { tracker.pending--; touch(); });
+        };
+    }
+}
+var net = window.__uploaderNet;
+var resources = performance.getEntriesByType('resource').length;
+if (resources !== net.resources) { net.resources = resources; net.last = Date.now(); }
+return document.readyState === 'complete' && net.pending <= 0 && Date.now() - net.last >= quiet;
+"""
+
+class StepTimer:
+    """Records how long each uploader step took, how much of it was spent waiting,
+    and the fixed sleeps the step replaced. start() ends the previous step."""
+
+    def __init__(self):
+        self.steps = []
+        self._current = None
+        self._started = 0.0
+
+    def start(self, name, replaced_sleep=0.0):
+        self.finish()
+        self._current = {"name": name, "elapsed": 0.0, "waited": 0.0, "replaced": replaced_sleep}
+        self._started = time.perf_counter()
+
+    def finish(self):
+        if self._current is not None:
+            self._current["elapsed"] = time.perf_counter() - self._started
+            self.steps.append(self._current)
+            self._current = None
+
+    def add_wait(self, seconds):
+        if self._current is not None:
+            self._current["waited"] += seconds
+
+    def report(self):
+        self.finish()
+        print("\n[Step timing]")
+        print(f"  {'step':<20} {'took s':>8} {'waited s':>9} {'old sleeps s':>13} {'saved s':>8}")
+        total = waited = replaced = 0.0
+        for record in self.steps:
+            saved = record["replaced"] - record["waited"]
+            print(f"  {record['name']:<20} {record['elapsed']:>8.1f} {record['waited']:>9.1f} {record['replaced']:>13.1f} {saved:>8.1f}")
+            total += record["elapsed"]
+            waited += record["waited"]
+            replaced += record["replaced"]
+        print(f"  {'total':<20} {total:>8.1f} {waited:>9.1f} {replaced:>13.1f} {replaced - waited:>8.1f}")
+
+class Waiter:
+    """Explicit waits bound to a driver. Timeouts return None/False instead of raising."""
+
+    def __init__(self, driver, timer=None):
+        self.driver = driver
+        self.timer = timer
+
+    def _booked(self, start):
+        if self.timer:
+            self.timer.add_wait(time.perf_counter() - start)
+
+    def until(self, condition, timeout=10, poll=POLL_INTERVAL):
+        """Polls condition(driver) until it returns something truthy; that value, or None on timeout."""
+        start = time.perf_counter()
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=poll).until(condition)
+        except TimeoutException:
+            return None
+        finally:
+            self._booked(start)
+
+    def js(self, script, *args, timeout=10):
+        """Waits for a JS probe (a script returning a truthy value) to hold."""
+        def probe(driver):
+            try:
+                return driver.execute_script(script, *args)
+            except WebDriverException:
+                return False
+        return self.until(probe, timeout)
+
+    def dom_idle(self, quiet=0.3, timeout=10):
+        """Waits until the DOM of the current frame (and its same-origin iframes) stops changing."""
+        start = time.perf_counter()
+        try:
+            self.driver.set_script_timeout(timeout + 5)
+            return bool(self.driver.execute_async_script(_DOM_IDLE_JS, int(quiet * 1000), int(timeout * 1000)))
+        except WebDriverException:
+            return False
+        finally:
+            self._booked(start)
+
+    def network_idle(self, quiet=0.5, timeout=15):
+        """Waits until the page is loaded and has no XHR/fetch in flight for `quiet` seconds."""
+        return bool(self.js(_NETWORK_IDLE_JS, int(quiet * 1000), timeout=timeout))
+
+    def alert(self, timeout=5):
+        """Returns the alert if one opens within timeout, else None."""
+        def alert_present(driver):
+            try:
+                return driver.switch_to.alert
+            except WebDriverException:
+                return False
+        return self.until(alert_present, timeout)
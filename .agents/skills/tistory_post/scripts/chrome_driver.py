@@ -0,0 +1,115 @@
+"""
+Chrome startup for the Selenium uploaders.
+
+ChromeDriverManager().install() checks the driver version online on every call;
+its result is cached in .tmp/chromedriver.json, so later runs start Chrome
+without any network access. The cached driver is only re-resolved when it is
+missing or chromedriver reports a Chrome version mismatch (e.g. after a browser
+update). A CHROMEDRIVER_PATH driver is always used as given.
+"""
+import os
+import re
+import json
+import time
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import SessionNotCreatedException
+
+DRIVER_CACHE_PATH = os.path.join(".tmp", "chromedriver.json")
+DRIVER_PATH_ENV = "CHROMEDRIVER_PATH"
+
+# Background features the uploaders never use
+LEAN_FLAGS = (
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-notifications",
+    "--disable-sync",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-features=Translate,OptimizationHints,MediaRouter",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--mute-audio",
+)
+HEADLESS_WINDOW_SIZE = "1920,1080"
+
+# chromedriver's session error when it was built for another Chrome major version
+_VERSION_MISMATCH_RE = re.compile(r"only supports Chrome version|Current browser version is", re.I)
+
+def _read_cached_path(path=DRIVER_CACHE_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f).get("path")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return cached if cached and os.path.exists(cached) else None
+
+def _write_cached_path(driver_path, path=DRIVER_CACHE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"path": driver_path, "resolved_at": time.strftime("%Y-%m-%d %H:%M:%S")}, f, indent=2)
+    os.replace(tmp_path, path)
+
+def resolve_chromedriver(refresh=False):
+    """
+    Returns (chromedriver path, source). Source is 'env' (CHROMEDRIVER_PATH), 'cache'
+    or 'download' (resolved by webdriver_manager, which may use the network).
+    """
+    env_path = os.getenv(DRIVER_PATH_ENV)
+    if env_path and not refresh:
+        return env_path, "env"
+    if not refresh:
+        cached = _read_cached_path()
+        if cached:
+            return cached, "cache"
+    from webdriver_manager.chrome import ChromeDriverManager
+    driver_path = ChromeDriverManager().install()
+    _write_cached_path(driver_path)
+    return driver_path, "download"
+
+def is_version_mismatch(error):
+    """True if a SessionNotCreatedException says chromedriver and Chrome versions differ."""
+    return isinstance(error, SessionNotCreatedException) and bool(_VERSION_MISMATCH_RE.search(str(error)))
+
+def build_options(user_agent=None, headless=False, user_data_dir=None, page_load_strategy="eager"):
+    options = webdriver.ChromeOptions()
+    for flag in LEAN_FLAGS:
+        options.add_argument(flag)
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument(f"--window-size={HEADLESS_WINDOW_SIZE}")
+    else:
+        options.add_argument("--start-maximized")
+    if user_agent:
+        options.add_argument(f"user-agent={user_agent}")
+    if user_data_dir:
+        options.add_argument(f"--user-data-dir={user_data_dir}")
+    # 'eager': driver.get() returns at DOMContentLoaded; the uploaders wait for what they need
+    options.page_load_strategy = page_load_strategy
+    return options
+
+def start_chrome(user_agent=None, headless=False, user_data_dir=None, page_load_strategy="eager"):
+    """Starts Chrome with the cached chromedriver and prints how long startup took."""
+    start = time.perf_counter()
+    driver_path, source = resolve_chromedriver()
+    resolved = time.perf_counter()
+    options = build_options(user_agent, headless, user_data_dir, page_load_strategy)
+    try:
+        driver = webdriver.Chrome(service=Service(driver_path), options=options)
+    except SessionNotCreatedException as e:
+        # Only a cached driver that no longer matches the installed Chrome is re-resolved;
+        # locked profiles, missing browsers and CHROMEDRIVER_PATH drivers fail as they are
+        if source != "cache" or not is_version_mismatch(e):
+            raise
+        print(f"Cached chromedriver does not match the installed Chrome ({str(e).splitlines()[0]}). Resolving a new one...")
+        driver_path, source = resolve_chromedriver(refresh=True)
+        resolved = time.perf_counter()
+        driver = webdriver.Chrome(service=Service(driver_path), options=options)
+    launched = time.perf_counter()
+    mode = "headless" if headless else "windowed"
+    print(f"Chrome started in {launched - start:.1f}s (driver from {source}: {resolved - start:.1f}s, launch: {launched - resolved:.1f}s, {mode}, page load '{page_load_strategy}').")
+    return driver
@@ -0,0 +1,383 @@
+import os
+import re
+import sys
+import json
+import html as html_lib
+import hashlib
+import argparse
+from bs4 import NavigableString
+from html_backend import make_soup, resolve_parser, PARSERS, PARSER_ENV
+
+DEFAULT_CACHE_DIR = os.path.join(".tmp", "manifests")
+# Bump when the manifest layout changes so stale cache files are rebuilt
+MANIFEST_VERSION = 5
+
+HASHTAG_DIV_STYLE = "margin-top: 30px; font-size: 0.9em; color: #718096; text-align: center;"
+
+_START_TAG_TEMPLATE = r'<{name}\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*>'
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+_ATTR_RE = re.compile(r'([^\s"\'>/=]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))')
+# Lazy-load attributes that hold the image path next to src
+LAZY_SRC_ATTRS = ("data-src", "data-original", "data-lazy-src", "data-filename")
+
+def read_html(html_path):
+    """Reads the file without newline translation, so manifest offsets index the exact file content."""
+    with open(html_path, "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+def write_html(html_path, html):
+    tmp_path = html_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        f.write(html)
+    os.replace(tmp_path, html_path)
+
+def content_hash(html):
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+class _SourceMap:
+    """Maps parsed tags back to the offset of their start tag ('<') in the source text."""
+
+    def __init__(self, html, soup):
+        self.html = html
+        self.soup = soup
+        self.line_starts = [0] + [m.end() for m in re.finditer("\n", html)]
+        self.comments = [(m.start(), m.end()) for m in _COMMENT_RE.finditer(html)]
+        self._by_name = {}
+        self._positioned = None
+
+    def _in_comment(self, offset):
+        return any(start <= offset < end for start, end in self.comments)
+
+    def _position(self, tag):
+        # html.parser records line/column for every tag
+        if tag.sourceline is None or tag.sourcepos is None:
+            return None
+        return self.line_starts[tag.sourceline - 1] + tag.sourcepos
+
+    def _parsed_starts(self, name):
+        """Start offsets of every <name> as html.parser sees them (parsed once, on first need)."""
+        if self._positioned is None:
+            self._positioned = make_soup(self.html, "html.parser")
+        return [self._position(t) for t in self._positioned.find_all(name)]
+
+    def offset(self, tag):
+        position = self._position(tag)
+        if position is not None:
+            return position
+        # lxml does not: pair the n-th <name> of the tree with the n-th <name in the
+        # source. A name missing from the source was synthesized by the parser (the
+        # <html>/<body> lxml wraps around a fragment) and has no offset. Otherwise, when
+        # the counts do not line up (markup-like text in <script>), pair with the n-th
+        # <name> of an html.parser tree instead.
+        if tag.name not in self._by_name:
+            tags = self.soup.find_all(tag.name)
+            starts = [m.start() for m in re.finditer(rf'<{tag.name}\b', self.html, re.IGNORECASE) if not self._in_comment(m.start())]
+            if starts and len(tags) != len(starts):
+                starts = self._parsed_starts(tag.name)
+            self._by_name[tag.name] = {id(t): start for t, start in zip(tags, starts)} if len(tags) == len(starts) else {}
+        return self._by_name[tag.name].get(id(tag))
+
+def _element_span(html, start, name):
+    """
+    For the element whose start tag begins at start, returns
+    (content_start, content_end, element_end) offsets, counting nested tags of the
+    same name. content_end/element_end are None when the element is never closed.
+    """
+    start_tag = re.compile(_START_TAG_TEMPLATE.format(name=name), re.IGNORECASE).match(html, start)
+    if not start_tag:
+        return None, None, None
+    depth = 1
+    tag_re = re.compile(rf'<(/?){name}\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*>', re.IGNORECASE)
+    for match in tag_re.finditer(html, start_tag.end()):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return start_tag.end(), match.start(), match.end()
+    return start_tag.end(), None, None
+
+def _attr_spans(html, tag_start):
+    """{name: [start, end]} of the attribute values inside the <img> start tag at tag_start."""
+    start_tag = re.compile(_START_TAG_TEMPLATE.format(name="img"), re.IGNORECASE).match(html, tag_start)
+    if not start_tag:
+        return {}
+    spans = {}
+    for match in _ATTR_RE.finditer(html, tag_start + len("<img"), start_tag.end()):
+        group = next(i for i in (2, 3, 4) if match.group(i) is not None)
+        spans.setdefault(match.group(1).lower(), [match.start(group), match.end(group)])
+    return spans
+
+def _image_spans(html, tag_start):
+    """
+    (src_span, lazy_spans) of the <img> at tag_start: the src value, and the values of
+    lazy-load attributes that repeat it (they must follow src when it is rewritten).
+    """
+    spans = _attr_spans(html, tag_start)
+    src_span = spans.get("src")
+    if src_span is None:
+        return None, []
+    src = html[src_span[0]:src_span[1]]
+    lazy_spans = [spans[name] for name in LAZY_SRC_ATTRS if name in spans and html[spans[name][0]:spans[name][1]] == src]
+    return src_span, lazy_spans
+
+def _hashtag_tags(text):
+    return [t.replace("#", "").strip() for t in text.split() if t.replace("#", "").strip()]
+
+def _split_blocks(soup):
+    """
+    Splits the body into paste-ready blocks for editors that take HTML chunks and
+    images separately (Naver): [{"type": "html", "html", "text"} | {"type": "img", "src"}].
+    The H1 is dropped (it becomes the post title), text gets explicit inline colors
+    because pasted HTML loses the stylesheet, and <img> tags are cut out of the chunks.
+    Mutates soup.
+    """
+    h1 = soup.find('h1')
+    if h1:
+        h1.decompose()
+
+    # Force black color on all general text blocks to prevent style bleeding
+    for tag in soup.find_all(['p', 'li', 'h2', 'h3', 'h4', 'blockquote']):
+        existing_style = tag.get('style', '')
+        if 'color' not in existing_style.lower():
+            tag['style'] = f"color: #000000; {existing_style}".strip()
+
+    # Apply blue color to important phrases (bold text)
+    for bold in soup.find_all(['b', 'strong']):
+        existing_style = bold.get('style', '')
+        bold['style'] = f"color: #0054FF; font-weight: bold; {existing_style}".strip()
+
+    blocks = []
+    chunk_html, chunk_text = [], []
+
+    def flush():
+        if chunk_html:
+            # text is the plain-text alternative put on the clipboard next to the HTML
+            blocks.append({"type": "html", "html": "".join(chunk_html), "text": "".join(chunk_text)})
+            chunk_html.clear()
+            chunk_text.clear()
+
+    root = soup.body if soup.body else soup
+    for element in root.children:
+        if element.name is None:
+            # Just text or whitespace; comments/doctype would otherwise be pasted as visible text
+            if type(element) is NavigableString and str(element).strip():
+                chunk_html.append(str(element))
+                chunk_text.append(str(element))
+            continue
+
+        img_tags = [element] if element.name == 'img' else element.find_all('img')
+        if not img_tags:
+            chunk_html.append(str(element))
+            chunk_text.append(element.get_text())
+            continue
+
+        flush()
+        for img in img_tags:
+            src = img.get('src')
+            if src and not src.startswith('http') and not src.startswith('//'):
+                blocks.append({"type": "img", "src": src})
+            # Remove the img tag so it's not pasted as a broken local link
+            img.decompose()
+        # Keep what is left around the image (e.g. a <figcaption>)
+        if element.name != 'img' and element.get_text().strip():
+            chunk_html.append(str(element))
+            chunk_text.append(element.get_text())
+    flush()
+    return blocks
+
+def build_manifest(html, parser=None):
+    """
+    Parses the post once and returns everything the downstream scripts need:
+    title, plain text, heading outline, bold phrases, images (with the source offsets of their
+    src values), the hashtag section and the paste-ready block segmentation.
+    Offsets are character offsets into html, used to patch the file in place.
+    """
+    parser = resolve_parser(parser)
+    soup = make_soup(html, parser)
+    source = _SourceMap(html, soup)
+
+    h1 = soup.find('h1')
+    outline = [
+        {"level": int(tag.name[1]), "text": tag.get_text(" ", strip=True)}
+        for tag in soup.find_all(['h1', 'h2', 'h3', 'h4'])
+    ]
+
+    bold = []
+    for tag in soup.find_all(['b', 'strong']):
+        phrase = tag.get_text(" ", strip=True)
+        if phrase and phrase not in bold:
+            bold.append(phrase)
+
+    images = []
+    for img in soup.find_all('img'):
+        offset = source.offset(img)
+        src_span, lazy_spans = _image_spans(html, offset) if offset is not None and img.get('src') is not None else (None, [])
+        images.append({
+            "src": img.get('src'),
+            "alt": img.get('alt', ''),
+            "prompt": img.get('data-prompt', img.get('alt', '')),
+            "src_span": src_span,
+            "lazy_spans": lazy_spans,
+        })
+
+    hashtags = []
+    for div in soup.find_all("div", class_="hashtag-section"):
+        for tag in _hashtag_tags(div.get_text(" ", strip=True)):
+            if tag not in hashtags:
+                hashtags.append(tag)
+
+    hashtag_section = None
+    first_section = soup.find("div", class_="hashtag-section")
+    if first_section is not None:
+        offset = source.offset(first_section)
+        content_start, content_end, _ = _element_span(html, offset, "div") if offset is not None else (None, None, None)
+        if content_end is not None:
+            hashtag_section = {"text": first_section.get_text(" ", strip=True), "span": [content_start, content_end]}
+
+    # Where a new hashtag section goes: before the footer, else at the end of the container/body/document
+    insert_at = len(html)
+    footer = soup.find("div", class_="footer")
+    container = soup.find("div", class_="container")
+    if footer is not None and source.offset(footer) is not None:
+        insert_at = source.offset(footer)
+    else:
+        for element, name in ((container, "div"), (soup.body, "body")):
+            offset = source.offset(element) if element is not None else None
+            if offset is not None:
+                _, content_end, _ = _element_span(html, offset, name)
+                if content_end is not None:
+                    insert_at = content_end
+                    break
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "parser": parser,
+        "title": h1.get_text().strip() if h1 else None,
+        "text": soup.get_text(separator=' ', strip=True),
+        "outline": outline,
+        "bold": bold,
+        "images": images,
+        "hashtags": hashtags,
+        "hashtag_section": hashtag_section,
+        "hashtag_insert_at": insert_at,
+    }
+    manifest["blocks"] = _split_blocks(soup)
+    return manifest
+
+def _cache_path(html_path, cache_dir):
+    key = hashlib.sha1(os.path.abspath(html_path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{key}.json")
+
+def load_manifest(html_path, cache_dir=DEFAULT_CACHE_DIR, use_cache=True, parser=None):
+    """
+    Returns the manifest of html_path, re-parsing only when the file changed.
+    The cached copy is trusted when mtime and size match; otherwise the content hash
+    decides (a touched but unchanged file is not re-parsed).
+    """
+    parser = resolve_parser(parser)
+    stat = os.stat(html_path)
+    cache_path = _cache_path(html_path, cache_dir)
+    cached = None
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = None
+        if cached and (cached.get("version") != MANIFEST_VERSION or cached.get("parser") != parser):
+            cached = None
+    if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+        return cached
+
+    html = read_html(html_path)
+    digest = content_hash(html)
+    if cached and cached["sha256"] == digest:
+        manifest = cached
+    else:
+        manifest = build_manifest(html, parser)
+        manifest["sha256"] = digest
+    manifest["path"] = html_path
+    manifest["mtime_ns"] = stat.st_mtime_ns
+    manifest["size"] = stat.st_size
+
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    return manifest
+
+def src_patch(image, new_src):
+    """Patch that replaces one image's src value (image is an entry of manifest['images'])."""
+    if image["src_span"] is None:
+        raise ValueError(f"Source position of <img src=\"{image['src']}\"> is unknown; cannot patch it")
+    start, end = image["src_span"]
+    return (start, end, html_lib.escape(new_src, quote=True))
+
+def image_ref_patches(image, new_src):
+    """Patches that point one image at new_src: its src and the lazy-load attributes (data-src, ...) repeating it."""
+    start, end, replacement = src_patch(image, new_src)
+    return [(start, end, replacement)] + [(lazy_start, lazy_end, replacement) for lazy_start, lazy_end in image["lazy_spans"]]
+
+def hashtag_patch(manifest, hashtags):
+    """Patch that fills the existing hashtag section, or inserts a new one."""
+    escaped = html_lib.escape(hashtags, quote=False)
+    section = manifest["hashtag_section"]
+    if section:
+        start, end = section["span"]
+        return (start, end, escaped)
+    insert_at = manifest["hashtag_insert_at"]
+    return (insert_at, insert_at, f'<div class="hashtag-section" style="{HASHTAG_DIV_STYLE}">{escaped}</div>')
+
+def patch_text(html, patches):
+    """Returns html with the (start, end, replacement) patches applied; the rest is kept byte-for-byte."""
+    parts = []
+    position = len(html)
+    for start, end, replacement in sorted(patches, key=lambda p: p[0], reverse=True):
+        if end > position:
+            raise ValueError(f"Overlapping patches at offset {start}")
+        parts.append(html[end:position])
+        parts.append(replacement)
+        position = start
+    parts.append(html[:position])
+    return "".join(reversed(parts))
+
+def apply_patches(html_path, manifest, patches):
+    """
+    Applies the patches to the file and writes it atomically. Refuses to patch
+    if the file changed since the manifest was built (offsets would be wrong).
+    """
+    html = read_html(html_path)
+    if content_hash(html) != manifest["sha256"]:
+        raise ValueError(f"{html_path} changed since its manifest was built; reload the manifest first")
+    html = patch_text(html, patches)
+    write_html(html_path, html)
+    return html
+
+def main():
+    parser = argparse.ArgumentParser(description="Build (or show the cached) manifest of a blog post HTML file.")
+    parser.add_argument("html_path", help="Path to the blog post HTML file")
+    parser.add_argument("--json", action="store_true", help="Print the full manifest as JSON")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and don't write the manifest cache")
+    parser.add_argument("--parser", choices=PARSERS, help=f"HTML parser backend (default: ${PARSER_ENV}, else lxml if installed, else html.parser)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.html_path):
+        print(f"HTML file not found: {args.html_path}")
+        sys.exit(1)
+
+    manifest = load_manifest(args.html_path, use_cache=not args.no_cache, parser=args.parser)
+    if args.json:
+        print(json.dumps(manifest, ensure_ascii=False, indent=2))
+        return
+    print(f"Title: {manifest['title']}")
+    print(f"Text: {len(manifest['text'])} chars")
+    for heading in manifest["outline"]:
+        print(f"  {'  ' * (heading['level'] - 1)}H{heading['level']} {heading['text']}")
+    print(f"Images: {len(manifest['images'])}")
+    for image in manifest["images"]:
+        print(f"  {image['src']} (prompt: {image['prompt'][:60]})")
+    print(f"Hashtags: {' '.join('#' + t for t in manifest['hashtags']) or '(none)'}")
+    print(f"Blocks: {len(manifest['blocks'])} ({sum(1 for b in manifest['blocks'] if b['type'] == 'img')} images)")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
-from email.utils import parsedate_to_datetime
-from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_tz, mktime_tz
+from concurrent.futures import ThreadPoolExecutor
+import io
 import sys
+import time
 
+import http.client
 import urllib.request
 import urllib.parse
 import xml.etree.ElementTree as ET
@@ -9,149 +12,334 @@ import json
 import os
 import argparse
 from dotenv import load_dotenv
+from http_cache import HttpCache, DEFAULT_MAX_AGE
+from translation_cache import TranslationCache
+from news_dedupe import cluster_news, DEFAULT_THRESHOLD
+from news_store import NewsStore
+from rank_news import write_top_news, DEFAULT_TOP_K
+from gemini_client import get_client
 
-def translate_to_english(text):
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
+DEFAULT_WORKERS = 8
+
+TRANSLATION_MODEL = "gemini-1.5-flash"
+
+def call_gemini(prompt, generation_config=None):
+    """Sends a single generateContent request and returns the response text. Raises GeminiError on failure."""
+    return get_client().generate_text(TRANSLATION_MODEL, prompt, generation_config=generation_config, timeout=(5, 10))
+
+def translate_to_english(text, cache=None):
+    if cache is not None:
+        cached = cache.get(text, TRANSLATION_MODEL)
+        if cached is not None:
+            return cached
+    if not os.getenv("GOOGLE_API_KEY"):
         return text
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={api_key}"
-    data = {
-        "contents": [{"parts": [{"text": f"Translate this Korean news search query to English keywords. ONLY return the English keywords without any extra text or quotes: {text}"}]}]
-    }
-    req_data = json.dumps(data).encode('utf-8')
-    req = urllib.request.Request(url, data=req_data, headers={'Content-Type': 'application/json'})
     try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            res = json.loads(response.read().decode('utf-8'))
-            return res['candidates'][0]['content']['parts'][0]['text'].strip()
+        translated = call_gemini(f"Translate this Korean news search query to English keywords. ONLY return the English keywords without any extra text or quotes: {text}")
     except Exception as e:
         print(f"Translation error: {e}")
         return text
+    if cache is not None and translated:
+        cache.put(text, TRANSLATION_MODEL, translated)
+    return translated
 
-def fetch_google_news(query, hl="ko", gl="KR"):
-    # ... existing code ...
+def translate_batch(texts, cache):
+    """
+    Translates every text missing from the cache in ONE Gemini request.
+    The model is asked for a JSON object {"<korean>": "<english keywords>"}.
+    Successful translations are stored in the cache; anything missing from the
+    response is left for translate_to_english to handle individually.
+    """
+    missing = cache.missing(texts, TRANSLATION_MODEL)
+    if not missing or not os.getenv("GOOGLE_API_KEY"):
+        return 0
+    prompt = (
+        "Translate each Korean news search query below to English search keywords. "
+        "Return ONLY a JSON object whose keys are the original Korean queries (unchanged) "
+        "and whose values are the English keywords without quotes or extra text.\n\n"
+        + json.dumps(missing, ensure_ascii=False)
+    )
+    try:
+        result = json.loads(call_gemini(prompt, generation_config={"responseMimeType": "application/json"}))
+    except Exception as e:
+        print(f"Batch translation error: {e}")
+        return 0
+    if not isinstance(result, dict):
+        print(f"Batch translation returned unexpected JSON: {result}")
+        return 0
+
+    translated = 0
+    for text in missing:
+        value = result.get(text)
+        if isinstance(value, str) and value.strip():
+            cache.put(text, TRANSLATION_MODEL, value.strip())
+            translated += 1
+    print(f"Batch-translated {translated}/{len(missing)} queries in one request.")
+    return translated
+
+def google_news_url(query, hl="ko", gl="KR"):
     encoded_query = urllib.parse.quote(query + " when:1d") # Try adding Google search operator for 1 day
     # Note: RSS parameters might not support 'when:1d' perfectly, so we still need manual filtering.
-    url = f"https://news.google.com/rss/search?q={encoded_query}&hl={hl}&gl={gl}&ceid={gl}:{hl}"
+    return f"https://news.google.com/rss/search?q={encoded_query}&hl={hl}&gl={gl}&ceid={gl}:{hl}"
+
+def fetch_google_news(query, hl="ko", gl="KR", cache=None):
+    url = google_news_url(query, hl=hl, gl=gl)
     try:
+        if cache is not None:
+            return cache.get(url, timeout=10)
         with urllib.request.urlopen(url, timeout=10) as response:
             return response.read()
-    except urllib.error.URLError as e:
+    except (OSError, http.client.HTTPException) as e:
+        # URLError, but also timeouts/resets while the body is read or parsed
         print(f"Error fetching news for {query}: {e}")
         return None
 
-def parse_news(xml_content):
-    if not xml_content:
-        return []
-    
+ITEM_FIELDS = ('title', 'link', 'pubDate', 'description')
+MAX_AGE_SECONDS = 24 * 60 * 60
+
+def parse_news_stream(source, now=None):
+    """
+    Incrementally parses an RSS feed from a file-like object (e.g. an HTTP response).
+
+    Each <item> is handled as soon as its end tag arrives: fields are read once,
+    the 24h cutoff (counted back from now, default: the current time) is checked
+    before anything is built, and the item is then cleared so memory stays flat
+    regardless of feed size.
+    """
+    items = []
+    cutoff = (time.time() if now is None else now) - MAX_AGE_SECONDS
+
     try:
-        root = ET.fromstring(xml_content)
-        items = []
-        
-        # Filter for last 24 hours
-        now = datetime.now(timezone.utc)
-        one_day_ago = now - timedelta(days=1)
-        
-        for item in root.findall('./channel/item'):
-            title = item.find('title').text if item.find('title') is not None else "No Title"
-            link = item.find('link').text if item.find('link') is not None else ""
-            pub_date_str = item.find('pubDate').text if item.find('pubDate') is not None else ""
-            description = item.find('description').text if item.find('description') is not None else ""
-            
-            # Date Filtering
-            if pub_date_str:
-                try:
-                    pub_date = parsedate_to_datetime(pub_date_str)
-                    if pub_date < one_day_ago:
-                        continue # Skip old news
-                except Exception as e:
-                    print(f"Error parsing date '{pub_date_str}': {e}")
-                    # If date parsing fails, maybe include it or skip? Let's skip to be safe.
-                    continue
-            else:
+        for _, elem in ET.iterparse(source, events=('end',)):
+            if elem.tag != 'item':
                 continue
 
-            items.append({
-                'title': title,
-                'link': link,
-                'pubDate': pub_date_str,
-                'description': description
-            })
-        return items
+            # Single pass over the children; the first occurrence of a field wins (same as item.find)
+            fields = {}
+            for child in elem:
+                if child.tag in ITEM_FIELDS and child.tag not in fields:
+                    fields[child.tag] = child.text
+
+            pub_date_str = fields.get('pubDate')
+            parsed = parsedate_tz(pub_date_str) if pub_date_str else None
+            # Missing, unparsable or older than 24h: skip before building anything
+            if parsed is not None and mktime_tz(parsed) >= cutoff:
+                items.append({
+                    'title': fields['title'] if 'title' in fields else "No Title",
+                    'link': fields.get('link', ""),
+                    'pubDate': pub_date_str,
+                    'description': fields.get('description', "")
+                })
+            elem.clear()
     except ET.ParseError as e:
-        print(f"Error parsing XML: {e}")
+        print(f"Error parsing XML: {e} (kept {len(items)} items parsed before the error)")
+    return items
+
+def parse_news(xml_content, now=None):
+    if not xml_content:
         return []
+    return parse_news_stream(io.BytesIO(xml_content), now)
 
-def main():
-    load_dotenv()
-    
-    parser = argparse.ArgumentParser(description="Fetch news from Google News")
-    parser.add_argument("--alias", type=str, help="Blog Alias for looking up default topic in .env")
-    parser.add_argument("--hl", type=str, default="ko", help="Host Language (e.g. ko, en)")
-    parser.add_argument("--gl", type=str, default="KR", help="Geolocation (e.g. KR, US)")
-    parser.add_argument("queries", nargs="*", help="List of topics to search")
-    args = parser.parse_args()
+def fetch_and_parse_news(query, hl="ko", gl="KR", cache=None):
+    """
+    Fetches and parses one feed. Cached bodies are parsed from memory; without
+    an enabled cache the response is parsed while it is still downloading.
+    """
+    if cache is not None and cache.enabled:
+        return parse_news(fetch_google_news(query, hl=hl, gl=gl, cache=cache))
+    try:
+        with urllib.request.urlopen(google_news_url(query, hl=hl, gl=gl), timeout=10) as response:
+            return parse_news_stream(response)
+    except (OSError, http.client.HTTPException) as e:
+        print(f"Error fetching news for {query}: {e}")
+        return []
+
+def build_jobs(queries, hl="ko", gl="KR"):
+    """
+    Expands queries into (query, hl, gl, translate) jobs.
+    The default ko/KR setting means "half Korean, half US": every query gets a
+    KR job and a US job whose query is translated to English first.
+    """
+    use_default_mixed_regions = (hl == "ko" and gl == "KR")
+    jobs = []
+    for query in queries:
+        if use_default_mixed_regions:
+            jobs.append((query, "ko", "KR", False))
+            jobs.append((query, "en", "US", True))
+        else:
+            jobs.append((query, hl, gl, False))
+    return jobs
+
+def fetch_job(query, hl, gl, translate=False, cache=None, translations=None):
+    """
+    Runs a single job (optional translation + RSS fetch + parse).
+    Returns (items, timings) where timings is a list of (label, seconds).
+    """
+    timings = []
+    search_query = query
+    if translate:
+        start = time.perf_counter()
+        search_query = translate_to_english(query, cache=translations)
+        timings.append((f"translate '{query}'", time.perf_counter() - start))
 
-    queries = args.queries
+    print(f"Fetching {gl} news for: {query} (hl={hl}, gl={gl}, query='{search_query}')")
+    start = time.perf_counter()
+    items = fetch_and_parse_news(search_query, hl=hl, gl=gl, cache=cache)
+    timings.append((f"fetch {gl} '{search_query}'", time.perf_counter() - start))
+    return items, timings
 
-    if not queries and args.alias:
-        target_alias = args.alias.upper()
+def fetch_all(jobs, max_workers=DEFAULT_WORKERS, cache=None, translations=None):
+    """
+    Runs all jobs concurrently (bounded by max_workers).
+    Returns (results, timings, wall_time) where results[i] is the item list of
+    jobs[i]. Merging in job order keeps the output independent of which request
+    finished first.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        outputs = list(executor.map(lambda job: fetch_job(*job, cache=cache, translations=translations), jobs))
+    wall_time = time.perf_counter() - start
+
+    results = []
+    timings = []
+    for items, job_timings in outputs:
+        results.append(items)
+        timings.extend(job_timings)
+    return results, timings, wall_time
+
+def print_timing_report(timings, wall_time):
+    print("\n[Timing]")
+    for label, elapsed in timings:
+        print(f"  {elapsed:6.2f}s  {label}")
+    total = sum(elapsed for _, elapsed in timings)
+    print(f"  Requests: {len(timings)}, sum of request time: {total:.2f}s, wall time: {wall_time:.2f}s")
+
+def split_topics(value):
+    return [q.strip() for q in value.split(",") if q.strip()]
+
+def get_alias_topics(alias):
+    """Default topics of a Tistory alias, falling back to Naver aliases."""
+    target_alias = alias.upper()
+    for platform in ("TISTORY", "NAVER"):
         for i in range(1, 6):
-            env_alias = os.getenv(f"TISTORY_ALIAS_{i}")
+            env_alias = os.getenv(f"{platform}_ALIAS_{i}")
             if env_alias and env_alias.upper() == target_alias:
-                default_topic = os.getenv(f"TISTORY_DEFAULT_TOPIC_{i}")
+                default_topic = os.getenv(f"{platform}_DEFAULT_TOPIC_{i}")
                 if default_topic:
-                    queries = [q.strip() for q in default_topic.split(",") if q.strip()]
+                    return split_topics(default_topic)
                 break
-        
-        # If not found in Tistory aliases, check Naver aliases
-        if not queries:
-            for i in range(1, 6):
-                env_alias = os.getenv(f"NAVER_ALIAS_{i}")
-                if env_alias and env_alias.upper() == target_alias:
-                    default_topic = os.getenv(f"NAVER_DEFAULT_TOPIC_{i}")
-                    if default_topic:
-                        queries = [q.strip() for q in default_topic.split(",") if q.strip()]
-                    break
-            
-    if not queries:
-        queries = ["경제", "부동산"]
-    
-    print(f"Fetching news for keywords (last 24h): {queries}")
-    all_news = []
-    
-    # Check if we should use the default "half Korean, half US" behavior
-    use_default_mixed_regions = (args.hl == "ko" and args.gl == "KR")
-    
-    for query in queries:
-        if use_default_mixed_regions:
-            # Fetch Korean New
-            print(f"Fetching KR news for: {query}")
-            kr_xml = fetch_google_news(query, hl="ko", gl="KR")
-            all_news.extend(parse_news(kr_xml))
-            
-            # Fetch US News
-            us_query = translate_to_english(query)
-            print(f"Fetching US news for: {query} (Translated: {us_query})")
-            us_xml = fetch_google_news(us_query, hl="en", gl="US")
-            all_news.extend(parse_news(us_xml))
-        else:
-            print(f"Fetching news for: {query} (hl={args.hl}, gl={args.gl})")
-            xml_content = fetch_google_news(query, hl=args.hl, gl=args.gl)
-            all_news.extend(parse_news(xml_content))
-        
-    # Deduplicate based on link or title
-    unique_news = {item['title']: item for item in all_news}.values() 
+    return []
+
+def get_all_alias_topics():
+    """Returns [(ALIAS, topics)] for every configured TISTORY_* and NAVER_* alias with topics."""
+    aliases = []
+    for platform in ("TISTORY", "NAVER"):
+        for i in range(1, 6):
+            env_alias = os.getenv(f"{platform}_ALIAS_{i}")
+            default_topic = os.getenv(f"{platform}_DEFAULT_TOPIC_{i}")
+            if env_alias and default_topic and env_alias.upper() not in [a for a, _ in aliases]:
+                aliases.append((env_alias.upper(), split_topics(default_topic)))
+    return aliases
+
+def write_news_output(all_news, queries, alias, args, translations, suffix=""):
+    """Clusters, stores and writes news_data{suffix}.json (+ the ranked top-K file) for one alias."""
+    # Merge near-duplicate stories (same news syndicated under slightly different titles)
+    unique_news = cluster_news(all_news, threshold=args.similarity)
+    print(f"Clustered {len(all_news)} items into {len(unique_news)} stories.")
+
+    # Remember everything in the local store (.tmp/news.db) so later runs can skip covered stories
+    store = NewsStore()
+    try:
+        news_ids = store.upsert(unique_news)
+        alias_key = (alias or "").upper()
+        if args.since_last_run:
+            # A story counts as seen if any outlet covering it was output before
+            already_emitted = store.emitted_ids(alias_key, [i for item_ids in news_ids for i in item_ids])
+            fresh = [(item, item_ids) for item, item_ids in zip(unique_news, news_ids) if already_emitted.isdisjoint(item_ids)]
+            print(f"--since-last-run: skipped {len(unique_news) - len(fresh)} stories already output for '{alias_key or '(no alias)'}'.")
+            unique_news = [item for item, _ in fresh]
+            news_ids = [item_ids for _, item_ids in fresh]
+        store.mark_emitted(alias_key, [i for item_ids in news_ids for i in item_ids])
+    finally:
+        store.close()
     
     output_dir = ".tmp"
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
         
-    output_file = os.path.join(output_dir, "news_data.json")
+    output_file = os.path.join(output_dir, f"news_data{suffix}.json")
     with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(list(unique_news), f, ensure_ascii=False, indent=2)
+        json.dump(unique_news, f, ensure_ascii=False, indent=2)
         
     print(f"Saved {len(unique_news)} relevant news items (last 24h) to {output_file}")
 
+    if args.top_k > 0:
+        # Score against the topics in both languages so US items can match too
+        topics = list(queries)
+        for query in queries:
+            translated = translations.get(query, TRANSLATION_MODEL)
+            if translated:
+                topics.append(translated)
+        write_top_news(unique_news, topics, output_file=os.path.join(output_dir, f"news_top{suffix}.json"), top_k=args.top_k)
+
+def main():
+    load_dotenv()
+    
+    parser = argparse.ArgumentParser(description="Fetch news from Google News")
+    parser.add_argument("--alias", type=str, help="Blog Alias for looking up default topic in .env")
+    parser.add_argument("--all-aliases", action="store_true", help="Fetch the default topics of every TISTORY_*/NAVER_* alias at once and write one news file per alias")
+    parser.add_argument("--hl", type=str, default="ko", help="Host Language (e.g. ko, en)")
+    parser.add_argument("--gl", type=str, default="KR", help="Geolocation (e.g. KR, US)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Max concurrent requests (translation + RSS)")
+    parser.add_argument("--no-cache", action="store_true", help="Always download RSS feeds (skip the .tmp/http_cache cache)")
+    parser.add_argument("--max-age", type=int, default=DEFAULT_MAX_AGE, help="Seconds a cached RSS feed is used without revalidation")
+    parser.add_argument("--no-batch-translate", action="store_true", help="Translate each query with its own request instead of one batched request")
+    parser.add_argument("--similarity", type=float, default=DEFAULT_THRESHOLD, help="Jaccard similarity (0-1) at which two news items are merged into one story")
+    parser.add_argument("--since-last-run", action="store_true", help="Only output stories not already output for this alias in an earlier run")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="Size of the ranked shortlist written to .tmp/news_top.json (0 to skip)")
+    parser.add_argument("queries", nargs="*", help="List of topics to search")
+    args = parser.parse_args()
+
+    if args.all_aliases:
+        alias_topics = get_all_alias_topics()
+        if not alias_topics:
+            print("Error: No TISTORY_ALIAS_*/NAVER_ALIAS_* with a DEFAULT_TOPIC found in .env")
+            sys.exit(1)
+        # Union of all topics, in first-seen order, so shared topics are fetched once
+        queries = []
+        for _, topics in alias_topics:
+            queries.extend(q for q in topics if q not in queries)
+    else:
+        queries = args.queries
+        if not queries and args.alias:
+            queries = get_alias_topics(args.alias)
+        if not queries:
+            queries = ["경제", "부동산"]
+    
+    print(f"Fetching news for keywords (last 24h): {queries}")
+    jobs = build_jobs(queries, hl=args.hl, gl=args.gl)
+    cache = HttpCache(max_age=args.max_age, enabled=not args.no_cache)
+    translations = TranslationCache()
+    if not args.no_batch_translate:
+        translate_batch([query for query, _, _, translate in jobs if translate], translations)
+    results, timings, wall_time = fetch_all(jobs, max_workers=args.workers, cache=cache, translations=translations)
+    translations.save()
+    print_timing_report(timings, wall_time)
+    print(f"  RSS cache: {cache.summary()}")
+    print(f"  Translation cache: hits={translations.hits}, misses={translations.misses}")
+    if get_client().stats:
+        print("  Gemini API:")
+        print(get_client().summary())
+
+    if not args.all_aliases:
+        all_news = [item for items in results for item in items]
+        write_news_output(all_news, queries, args.alias, args, translations)
+        return
+
+    for alias, topics in alias_topics:
+        print(f"\n[{alias}] topics: {topics}")
+        alias_news = [item for job, items in zip(jobs, results) if job[0] in topics for item in items]
+        write_news_output(alias_news, topics, alias, args, translations, suffix=f"_{alias}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,261 @@
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_tz, mktime_tz
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 60)
+
+# Requests per minute allowed per model (token bucket). Unlisted models use DEFAULT_RPM.
+DEFAULT_RPM = 30
+MODEL_RPM = {
+    "gemini-1.5-flash": 15,
+    "gemini-2.0-flash": 15,
+    "imagen-4.0-generate-001": 10,
+}
+
+class GeminiError(Exception):
+    """Raised by generate_text when the API call fails."""
+
+    def __init__(self, message, status_code=None, response=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = response
+
+class CircuitOpenError(GeminiError):
+    """Raised without calling the API while a model's quota is known to be exhausted."""
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, bounded by max_attempts and an overall deadline.
+    Server hints (Retry-After header, RetryInfo.retryDelay in the error body) take
+    precedence over the computed backoff.
+    """
+
+    def __init__(self, max_attempts=5, base_delay=2.0, max_delay=60.0, deadline=300.0, breaker_cooldown=300.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.breaker_cooldown = breaker_cooldown
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+def _parse_duration(value):
+    """'37s' / '1.5s' (protobuf Duration JSON) -> seconds, None if unparsable."""
+    try:
+        return float(str(value).rstrip("s"))
+    except ValueError:
+        return None
+
+def retry_hint(response):
+    """
+    Reads the server's retry hints from a failed response.
+    Returns (delay_seconds or None, quota_exhausted) where quota_exhausted means a
+    daily quota was hit, so retrying within this run is pointless.
+    """
+    delay = None
+    header = response.headers.get("Retry-After")
+    if header:
+        delay = _parse_duration(header)
+        if delay is None:
+            parsed = parsedate_tz(header)
+            if parsed is not None:
+                delay = max(0.0, mktime_tz(parsed) - time.time())
+
+    quota_exhausted = False
+    try:
+        details = response.json().get("error", {}).get("details", [])
+    except ValueError:
+        details = []
+    for detail in details:
+        detail_type = detail.get("@type", "")
+        if detail_type.endswith("google.rpc.RetryInfo") and delay is None:
+            delay = _parse_duration(detail.get("retryDelay", ""))
+        elif detail_type.endswith("google.rpc.QuotaFailure"):
+            for violation in detail.get("violations", []):
+                if "PerDay" in violation.get("quotaId", ""):
+                    quota_exhausted = True
+    return delay, quota_exhausted
+
+class TokenBucket:
+    """Thread-safe token bucket: allows `burst` calls at once, refilled at rate_per_minute."""
+
+    def __init__(self, rate_per_minute, burst=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, rate_per_minute // 4))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+class GeminiClient:
+    """
+    Shared Gemini/Imagen REST client.
+
+    - One pooled keep-alive requests.Session, so every call in a run reuses TLS connections.
+    - Explicit connect/read timeouts on every request.
+    - A token bucket per model to stay under the per-minute quota instead of hitting 429s.
+    - Per-model call/error counts, latency and time spent backing off, printed with summary().
+    - post_with_retry(): backoff honoring server hints, plus a per-model circuit breaker.
+    """
+
+    def __init__(self, api_key=None, timeout=DEFAULT_TIMEOUT, model_rpm=None):
+        self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
+        self.timeout = timeout
+        self.model_rpm = dict(MODEL_RPM, **(model_rpm or {}))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+        self.stats = {}
+        self._buckets = {}
+        self._open_until = {}  # model -> time until which calls fail fast
+        self._lock = threading.Lock()
+
+    def _bucket(self, model):
+        with self._lock:
+            if model not in self._buckets:
+                self._buckets[model] = TokenBucket(self.model_rpm.get(model, DEFAULT_RPM))
+            return self._buckets[model]
+
+    def _model_stats(self, model):
+        # Caller holds self._lock
+        return self.stats.setdefault(model, {"calls": 0, "errors": 0, "latency": 0.0, "max_latency": 0.0, "waited": 0.0, "backoff": 0.0})
+
+    def _record(self, model, latency, waited, error):
+        with self._lock:
+            s = self._model_stats(model)
+            s["calls"] += 1
+            s["errors"] += 1 if error else 0
+            s["latency"] += latency
+            s["max_latency"] = max(s["max_latency"], latency)
+            s["waited"] += waited
+
+    def post(self, model, method, payload, timeout=None):
+        """
+        POSTs payload to models/<model>:<method> and returns the requests.Response
+        (any status code). Network errors are re-raised after being counted.
+        """
+        waited = self._bucket(model).acquire()
+        url = f"{BASE_URL}/{model}:{method}"
+        start = time.perf_counter()
+        try:
+            response = self.session.post(url, params={"key": self.api_key}, json=payload, timeout=timeout or self.timeout)
+        except requests.RequestException:
+            self._record(model, time.perf_counter() - start, waited, True)
+            raise
+        self._record(model, time.perf_counter() - start, waited, response.status_code != 200)
+        return response
+
+    def _add_backoff(self, model, seconds):
+        with self._lock:
+            self._model_stats(model)["backoff"] += seconds
+
+    def _open_circuit(self, model, seconds, reason):
+        with self._lock:
+            self._open_until[model] = time.monotonic() + seconds
+        print(f"Circuit opened for {model} ({reason}); failing fast for {seconds:.0f}s.")
+
+    def post_with_retry(self, model, method, payload, policy=None, timeout=None):
+        """
+        Like post(), but retries 429/5xx and network errors according to policy.
+        Returns the last response. Raises CircuitOpenError when the model's quota is
+        known to be exhausted (daily quota hit, or an earlier call gave up on 429s).
+        """
+        policy = policy or RetryPolicy()
+        start = time.monotonic()
+        for attempt in range(policy.max_attempts):
+            with self._lock:
+                open_until = self._open_until.get(model, 0)
+            if time.monotonic() < open_until:
+                raise CircuitOpenError(f"{model} quota exhausted; not calling the API for another {open_until - time.monotonic():.0f}s")
+
+            last_attempt = attempt == policy.max_attempts - 1
+            error = None
+            try:
+                response = self.post(model, method, payload, timeout=timeout)
+            except requests.RequestException as e:
+                error = e
+                delay, reason = policy.backoff(attempt), f"network error: {e}"
+            else:
+                if response.status_code not in RETRYABLE_STATUS:
+                    return response
+                hinted, quota_exhausted = retry_hint(response)
+                # Small jitter on top of server hints so parallel workers don't retry in lockstep
+                delay = hinted + random.uniform(0, 1) if hinted is not None else policy.backoff(attempt)
+                reason = f"HTTP {response.status_code}"
+                if quota_exhausted:
+                    self._open_circuit(model, policy.breaker_cooldown, "daily quota exhausted")
+                    return response
+
+            remaining = policy.deadline - (time.monotonic() - start)
+            if last_attempt or delay > remaining:
+                if error is not None:
+                    raise error
+                if reason == "HTTP 429":
+                    self._open_circuit(model, policy.breaker_cooldown, "still rate limited after retries")
+                return response
+            print(f"{model}: {reason}, retrying in {delay:.1f}s (attempt {attempt + 2}/{policy.max_attempts})")
+            time.sleep(delay)
+            self._add_backoff(model, delay)
+        return response
+
+    def generate_text(self, model, prompt, generation_config=None, timeout=None):
+        """Single-turn generateContent call. Returns the stripped response text or raises GeminiError."""
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        if generation_config:
+            payload["generationConfig"] = generation_config
+        try:
+            response = self.post(model, "generateContent", payload, timeout=timeout)
+        except requests.RequestException as e:
+            raise GeminiError(f"Request to {model} failed: {e}") from e
+        if response.status_code != 200:
+            raise GeminiError(f"{model} returned {response.status_code}: {response.text}", response.status_code, response)
+        try:
+            return response.json()['candidates'][0]['content']['parts'][0]['text'].strip()
+        except (ValueError, KeyError, IndexError) as e:
+            raise GeminiError(f"Unexpected response from {model}: {response.text}", response.status_code, response) from e
+
+    def summary(self):
+        lines = []
+        for model, s in sorted(self.stats.items()):
+            avg = s["latency"] / s["calls"] if s["calls"] else 0.0
+            lines.append(
+                f"  {model}: calls={s['calls']}, errors={s['errors']}, "
+                f"avg={avg:.2f}s, max={s['max_latency']:.2f}s, rate-limit wait={s['waited']:.2f}s, retry backoff={s['backoff']:.2f}s"
+            )
+        return "\n".join(lines)
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Returns the process-wide shared client (created on first use)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GeminiClient()
+        return _client
@@ -1,100 +1,186 @@
 import os
-import sys
-import requests
 import json
-from bs4 import BeautifulSoup
+import hashlib
+import argparse
 from dotenv import load_dotenv
+from gemini_client import get_client, GeminiError
+from document_manifest import load_manifest, hashtag_patch, apply_patches
+from keyword_extractor import extract_hashtags
 
 # Load environment variables
 load_dotenv()
 
+# Only the Gemini engine needs the key; the local engine runs offline
 API_KEY = os.getenv("GOOGLE_API_KEY")
-if not API_KEY:
-    raise ValueError("GOOGLE_API_KEY not found in .env file")
+ENGINES = ("auto", "gemini", "local")
 
-def generate_hashtags(html_path):
-    if not os.path.exists(html_path):
-        print(f"HTML file not found: {html_path}")
-        return
+HASHTAG_MODEL = "gemini-2.0-flash"
+DEFAULT_CACHE_PATH = os.path.join(".tmp", "hashtag_cache.json")
+DEFAULT_MAX_CACHE_ENTRIES = 200
+MAX_BOLD_PHRASES = 40
+MAX_DIGEST_CHARS = 4000
+
+def build_digest(manifest):
+    """
+    Compact summary of the post for the prompt: H1, the H2/H3 outline and the bolded
+    key phrases. Mega-content posts open with an intro and a table of contents, so
+    the first N characters of plain text say little about what the post covers.
+    """
+    lines = [f"Title: {manifest['title'] or ''}", "Outline:"]
+    for heading in manifest["outline"]:
+        if heading["level"] in (2, 3) and heading["text"]:
+            lines.append(f"{'  ' * (heading['level'] - 2)}- {heading['text']}")
+    if manifest["bold"]:
+        lines.append("Key phrases: " + ", ".join(manifest["bold"][:MAX_BOLD_PHRASES]))
+    digest = "\n".join(lines)
+    if len(manifest["outline"]) <= 1 and not manifest["bold"]:
+        # No structure to summarize: fall back to the beginning of the text
+        digest += "\nContent:\n" + manifest["text"][:2000]
+    return digest[:MAX_DIGEST_CHARS]
+
+def get_alias_categories(alias):
+    """Category list (TISTORY_CATEGORIES_<n>) of a Tistory alias, [] if none is configured."""
+    for i in range(1, 6):
+        env_alias = os.getenv(f"TISTORY_ALIAS_{i}")
+        if env_alias and env_alias.upper() == alias.upper():
+            return [c.strip() for c in os.getenv(f"TISTORY_CATEGORIES_{i}", "").split(",") if c.strip()]
+    return []
 
-    with open(html_path, 'r', encoding='utf-8') as f:
-        soup = BeautifulSoup(f.read(), 'html.parser')
+def load_cache(path=DEFAULT_CACHE_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable hashtag cache: {e}")
+        return {}
 
-    # Extract text content for context (first 2000 chars is usually enough)
-    text_content = soup.get_text(separator=' ', strip=True)[:2000]
+def save_cache(cache, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_CACHE_ENTRIES):
+    """Writes the cache, keeping only the max_entries most recently used entries (the last ones)."""
+    for key in list(cache)[:max(len(cache) - max_entries, 0)]:
+        del cache[key]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
 
-    # Gemini API URL (Gemini 2.0 Flash)
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={API_KEY}"
-    
-    headers = {
-        "Content-Type": "application/json"
-    }
-    
-    prompt_text = f"Analyze the following blog post content and generate 10 relevant, trending Korean hashtags. Format the output as a single line of space-separated hashtags (e.g., #Keyword1 #Keyword2). Do not include any other text or explanations.\n\nContent:\n{text_content}"
+def cache_key(digest, categories):
+    """sha256 of the digest (with model and categories); the digest itself is never stored."""
+    return hashlib.sha256(f"{HASHTAG_MODEL}\n{json.dumps(categories, ensure_ascii=False)}\n{digest}".encode("utf-8")).hexdigest()
 
-    payload = {
-        "contents": [{
-            "parts": [{"text": prompt_text}]
-        }]
-    }
+def request_hashtags(digest, categories=None):
+    """
+    One Gemini call. Returns (hashtags, category); category is None unless categories
+    were given, in which case the model picks one of them in the same request.
+    """
+    instructions = "Analyze the following blog post summary and generate 10 relevant, trending Korean hashtags."
+    if not categories:
+        prompt = f"{instructions} Format the output as a single line of space-separated hashtags (e.g., #Keyword1 #Keyword2). Do not include any other text or explanations.\n\n{digest}"
+        return get_client().generate_text(HASHTAG_MODEL, prompt), None
 
+    prompt = (
+        f"{instructions} Also pick the ONE most relevant category for the post from this list: {json.dumps(categories, ensure_ascii=False)}.\n"
+        'Respond with JSON only: {"hashtags": "#Keyword1 #Keyword2 ...", "category": "<exact category from the list>"}\n\n'
+        f"{digest}"
+    )
+    text = get_client().generate_text(HASHTAG_MODEL, prompt, generation_config={"responseMimeType": "application/json"})
     try:
-        response = requests.post(url, headers=headers, json=payload)
-        
-        if response.status_code == 200:
-            result = response.json()
-            try:
-                hashtags = result['candidates'][0]['content']['parts'][0]['text'].strip()
-                print(f"Generated Hashtags: {hashtags}")
-
-                # Save to hashtags.txt
-                base_dir = os.path.dirname(html_path)
-                hashtag_file_path = os.path.join(base_dir, "hashtags.txt")
-                with open(hashtag_file_path, "w", encoding="utf-8") as hf:
-                    hf.write(hashtags)
-                print(f"Hashtags saved to: {hashtag_file_path}")
-
-                # Check for existing hashtag section
-                existing_hashtag_div = soup.find("div", class_="hashtag-section")
-                if existing_hashtag_div:
-                    existing_hashtag_div.string = hashtags
-                    print("Updated existing hashtag section.")
-                else:
-                    # Create new div
-                    hashtag_div = soup.new_tag("div", attrs={"class": "hashtag-section", "style": "margin-top: 30px; font-size: 0.9em; color: #718096; text-align: center;"})
-                    hashtag_div.string = hashtags
-                    
-                    # Insert before footer or at the end of container
-                    footer = soup.find("div", class_="footer")
-                    if footer:
-                        footer.insert_before(hashtag_div)
-                    else:
-                        container = soup.find("div", class_="container")
-                        if container:
-                            container.append(hashtag_div)
-                        else:
-                            if soup.body:
-                                soup.body.append(hashtag_div)
-                            else:
-                                soup.append(hashtag_div)
-
-                with open(html_path, 'w', encoding='utf-8') as f:
-                    f.write(str(soup))
-                print(f"Hashtags appended to: {html_path}")
-                
-            except (KeyError, IndexError) as e:
-                print(f"Error parsing API response: {e}")
-                print(f"Response: {result}")
+        result = json.loads(text)
+        hashtags = result["hashtags"].strip()
+    except (ValueError, KeyError, AttributeError, TypeError) as e:
+        raise GeminiError(f"Unexpected hashtag/category response: {text}") from e
+    category = result.get("category")
+    if category not in categories:
+        print(f"Warning: Model picked unknown category '{category}'; not writing category.txt.")
+        category = None
+    return hashtags, category
+
+def gemini_hashtags(manifest, categories, use_cache=True):
+    """Hashtags (and category) from Gemini, cached by digest hash (LRU). Raises GeminiError."""
+    digest = build_digest(manifest)
+    key = cache_key(digest, categories)
+    cache = load_cache() if use_cache else {}
+    if key in cache:
+        print("Using cached hashtags (post outline unchanged).")
+        # Move to the end, so it is evicted last
+        entry = cache[key] = cache.pop(key)
+        save_cache(cache)
+        return entry["hashtags"], entry.get("category")
+    hashtags, category = request_hashtags(digest, categories)
+    if use_cache:
+        cache[key] = {"hashtags": hashtags, "category": category}
+        save_cache(cache)
+    return hashtags, category
+
+def generate_hashtags(html_path, alias=None, use_cache=True, engine="auto"):
+    """
+    engine: 'gemini' (API only), 'local' (offline keyword extraction only) or
+    'auto' (Gemini, falling back to the local engine when the API fails or no key is set).
+    """
+    if not os.path.exists(html_path):
+        print(f"HTML file not found: {html_path}")
+        return
+
+    manifest = load_manifest(html_path)
+    categories = get_alias_categories(alias) if alias else []
+    if alias and not categories:
+        print(f"Warning: No TISTORY_CATEGORIES_* configured for alias '{alias}'; generating hashtags only.")
+
+    hashtags = category = None
+    if engine != "local":
+        if not API_KEY:
+            print("GOOGLE_API_KEY not found in .env file")
         else:
-            print(f"Error: {response.status_code}, {response.text}")
+            try:
+                hashtags, category = gemini_hashtags(manifest, categories, use_cache=use_cache)
+            except GeminiError as e:
+                print(f"Error generating hashtags: {e}")
+        if hashtags is None and engine == "gemini":
+            return
+    if hashtags is None:
+        if engine == "auto":
+            print("Falling back to the local keyword engine.")
+        hashtags = extract_hashtags(manifest)
+        if categories:
+            print("Note: The local engine does not pick a category; category.txt left unchanged.")
+        if not hashtags:
+            print("No keywords found in the post.")
+            return
+    print(f"Generated Hashtags: {hashtags}")
 
-    except Exception as e:
-        print(f"Error generating hashtags: {e}")
+    # Save to hashtags.txt
+    base_dir = os.path.dirname(html_path)
+    hashtag_file_path = os.path.join(base_dir, "hashtags.txt")
+    with open(hashtag_file_path, "w", encoding="utf-8") as hf:
+        hf.write(hashtags)
+    print(f"Hashtags saved to: {hashtag_file_path}")
+
+    if category:
+        category_file_path = os.path.join(base_dir, "category.txt")
+        with open(category_file_path, "w", encoding="utf-8") as cf:
+            cf.write(category)
+        print(f"Category '{category}' saved to: {category_file_path}")
+
+    # Fill the existing hashtag section (or insert one before the footer) in place
+    if manifest["hashtag_section"] and manifest["hashtag_section"]["text"] == hashtags:
+        print("Hashtag section already up to date.")
+        return
+    apply_patches(html_path, manifest, [hashtag_patch(manifest, hashtags)])
+    if manifest["hashtag_section"]:
+        print("Updated existing hashtag section.")
+    print(f"Hashtags appended to: {html_path}")
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: py execution/generate_hashtags.py <html_path>")
-        sys.exit(1)
-    
-    html_path = sys.argv[1]
-    generate_hashtags(html_path)
+    parser = argparse.ArgumentParser(description="Generate hashtags (and optionally the category) for a blog post.")
+    parser.add_argument("html_path", help="Path to the blog post HTML file")
+    parser.add_argument("--alias", help="Blog alias: also pick category.txt from TISTORY_CATEGORIES_<n> in the same API call")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the API, even if the post outline is unchanged")
+    parser.add_argument("--engine", choices=ENGINES, default="auto", help="gemini, local (offline, no API call) or auto (Gemini with local fallback)")
+    args = parser.parse_args()
+
+    generate_hashtags(args.html_path, alias=args.alias, use_cache=not args.no_cache, engine=args.engine)
+    if get_client().stats:
+        print("[Gemini API]")
+        print(get_client().summary())
@@ -0,0 +1,36 @@
+import os
+import functools
+from bs4 import BeautifulSoup
+
+# Backend used when neither a flag nor HTML_PARSER picks one: lxml if installed, else the stdlib parser
+PARSER_ENV = "HTML_PARSER"
+PARSERS = ("lxml", "html.parser")
+
+@functools.lru_cache(maxsize=None)
+def lxml_available():
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def resolve_parser(name=None):
+    """
+    Returns the BeautifulSoup backend to use: name (e.g. from a --parser flag), else
+    the HTML_PARSER env var, else lxml when installed, else html.parser.
+    Asking for lxml without it installed falls back to html.parser with a warning.
+    """
+    name = name or os.getenv(PARSER_ENV) or ("lxml" if lxml_available() else "html.parser")
+    if name not in PARSERS:
+        raise ValueError(f"Unknown HTML parser '{name}' (choose from: {', '.join(PARSERS)})")
+    if name == "lxml" and not lxml_available():
+        _warn_missing_lxml()
+        return "html.parser"
+    return name
+
+@functools.lru_cache(maxsize=None)
+def _warn_missing_lxml():
+    print("lxml is not installed; falling back to html.parser.")
+
+def make_soup(markup, parser=None):
+    return BeautifulSoup(markup, resolve_parser(parser))
@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import http.client
+import urllib.request
+import urllib.error
+
+DEFAULT_CACHE_DIR = os.path.join(".tmp", "http_cache")
+DEFAULT_MAX_AGE = 30 * 60  # seconds
+
+class HttpCache:
+    """
+    Small persistent HTTP cache for GET requests (RSS feeds).
+
+    Each URL is stored as two files under cache_dir, keyed by the SHA-1 of the URL:
+      <key>.body  raw response body
+      <key>.json  metadata (url, fetched_at, etag, last_modified)
+
+    - Entries younger than max_age are served without touching the network.
+    - Older entries are revalidated with If-None-Match / If-Modified-Since;
+      a 304 response reuses the stored body.
+    - If the network fails and a stale copy exists, the stale copy is served.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_age=DEFAULT_MAX_AGE, enabled=True):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.enabled = enabled
+        self.stats = {"hit": 0, "revalidated": 0, "miss": 0, "stale": 0}
+        self._lock = threading.Lock()
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".body", base + ".json"
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _load(self, url):
+        body_path, meta_path = self._paths(url)
+        if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+            return None, None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        if meta.get("url") != url:
+            return None, None
+        return meta, body
+
+    def _store(self, url, body, headers, meta=None):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        body_path, meta_path = self._paths(url)
+        meta = dict(meta or {})
+        meta["url"] = url
+        meta["fetched_at"] = time.time()
+        if headers is not None:
+            meta["etag"] = headers.get("ETag") or meta.get("etag")
+            meta["last_modified"] = headers.get("Last-Modified") or meta.get("last_modified")
+        if body is not None:
+            # Write to a temp file first so concurrent readers never see a partial body
+            tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, body_path)
+        tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def get(self, url, timeout=10):
+        """
+        Returns the response body (bytes) for url.
+        Raises OSError (URLError, timeouts, resets) or http.client.HTTPException
+        (truncated body) if the network fails and nothing is cached.
+        """
+        if not self.enabled:
+            self._count("miss")
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                return response.read()
+
+        meta, body = self._load(url)
+        if meta is not None and time.time() - meta.get("fetched_at", 0) < self.max_age:
+            self._count("hit")
+            return body
+
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        req = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as response:
+                new_body = response.read()
+                self._store(url, new_body, response.headers)
+            self._count("miss")
+            return new_body
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and meta is not None:
+                # Not modified: keep the stored body, refresh the timestamp
+                self._store(url, None, e.headers, meta)
+                self._count("revalidated")
+                return body
+            if meta is not None:
+                print(f"HTTP {e.code} for {url}, serving stale cached copy.")
+                self._count("stale")
+                return body
+            raise
+        except (OSError, http.client.HTTPException) as e:
+            if meta is not None:
+                print(f"Network error for {url} ({e}), serving stale cached copy.")
+                self._count("stale")
+                return body
+            raise
+
+    def summary(self):
+        s = self.stats
+        return f"hits={s['hit']}, revalidated(304)={s['revalidated']}, misses={s['miss']}, stale={s['stale']}"
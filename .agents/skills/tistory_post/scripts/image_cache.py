@@ -0,0 +1,117 @@
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+DEFAULT_CACHE_DIR = os.path.join(".tmp", "image_cache")
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+_NON_WORD_RE = re.compile(r'[^\w]+')
+
+def normalize_prompt(prompt):
+    """Lowercase, punctuation-free, whitespace-collapsed prompt used by --reuse-similar."""
+    return _NON_WORD_RE.sub(' ', (prompt or "").lower()).strip()
+
+def cache_key(model, prompt, aspect_ratio):
+    return hashlib.sha256(f"{model}\n{aspect_ratio}\n{prompt}".encode("utf-8")).hexdigest()
+
+class ImageCache:
+    """
+    Content-addressed store of generated images shared by every result folder and alias.
+
+    Images are stored as <sha256(model, aspect ratio, prompt)>.png under cache_dir,
+    with index.json holding the prompt, size and last use time of each entry.
+    Once the total size passes max_bytes, the least recently used images are evicted.
+    Cached images are hardlinked into the result folder (copied if linking fails).
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable image cache index: {e}")
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def _save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _find_key(self, prompt, model, aspect_ratio, similar):
+        key = cache_key(model, prompt, aspect_ratio)
+        if key in self._index and os.path.exists(self._path(key)):
+            return key
+        if similar:
+            normalized = normalize_prompt(prompt)
+            for other_key, entry in self._index.items():
+                if (entry["model"] == model and entry["aspect_ratio"] == aspect_ratio
+                        and entry["normalized"] == normalized and os.path.exists(self._path(other_key))):
+                    return other_key
+        return None
+
+    def fetch(self, prompt, model, aspect_ratio, output_path, similar=False):
+        """Places a cached image for this prompt at output_path. Returns True on a cache hit."""
+        with self._lock:
+            key = self._find_key(prompt, model, aspect_ratio, similar)
+            if key is None:
+                self.misses += 1
+                return False
+            self._index[key]["last_used"] = time.time()
+            self._save_index()
+            self.hits += 1
+
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        try:
+            os.link(self._path(key), output_path)
+        except OSError:
+            shutil.copy2(self._path(key), output_path)
+        return True
+
+    def store(self, prompt, model, aspect_ratio, image_path):
+        """Adds a freshly generated image to the cache, then evicts LRU entries over the size cap."""
+        key = cache_key(model, prompt, aspect_ratio)
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            shutil.copyfile(image_path, tmp_path)
+            os.replace(tmp_path, self._path(key))
+            self._index[key] = {
+                "prompt": prompt,
+                "normalized": normalize_prompt(prompt),
+                "model": model,
+                "aspect_ratio": aspect_ratio,
+                "size": os.path.getsize(self._path(key)),
+                "last_used": time.time()
+            }
+            self._evict()
+            self._save_index()
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._index[key]["size"]
+            del self._index[key]
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
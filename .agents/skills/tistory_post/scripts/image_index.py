@@ -0,0 +1,204 @@
+import os
+import sys
+import json
+import argparse
+import numpy as np
+from PIL import Image
+
+DEFAULT_ROOT = "result"
+DEFAULT_INDEX_PATH = os.path.join(".tmp", "image_index.json")
+DEFAULT_THRESHOLD = 8  # max Hamming distance (of 64 bits) to count as a near-duplicate
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp")
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n))
+    matrix[0] *= 1 / np.sqrt(2)
+    return matrix * np.sqrt(2 / n)
+
+_DCT_32 = _dct_matrix(32)
+
+def _bits_to_int(bits):
+    value = 0
+    for bit in bits.ravel():
+        value = (value << 1) | int(bit)
+    return value
+
+def dhash(img):
+    """Difference hash: compares horizontally adjacent pixels of a 9x8 grayscale thumbnail."""
+    pixels = np.asarray(img.convert("L").resize((9, 8), Image.LANCZOS), dtype=np.int16)
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+def phash(img):
+    """Perceptual hash: low 8x8 DCT frequencies of a 32x32 grayscale thumbnail vs. their median."""
+    pixels = np.asarray(img.convert("L").resize((32, 32), Image.LANCZOS), dtype=np.float64)
+    low = (_DCT_32 @ pixels @ _DCT_32.T)[:8, :8]
+    return _bits_to_int(low > np.median(low))
+
+def _is_inside(path, folder):
+    """True if path is below folder; both relative to the same base, or both absolute."""
+    path, folder = os.path.normcase(path), os.path.normcase(folder)
+    return path.startswith(folder.rstrip(os.sep) + os.sep)
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes: radius queries without scanning every entry."""
+
+    def __init__(self):
+        self.root = None  # (hash, [paths], {distance: child})
+
+    def add(self, value, path):
+        if self.root is None:
+            self.root = (value, [path], {})
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(path)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, [path], {})
+                return
+            node = child
+
+    def query(self, value, radius):
+        """Returns [(distance, path)] for every stored hash within radius of value."""
+        results = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                results.extend((distance, path) for path in node[1])
+            for edge, child in node[2].items():
+                # Triangle inequality: only subtrees at |edge - distance| <= radius can match
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return sorted(results)
+
+class ImageIndex:
+    """
+    Perceptual-hash index of every image under root, stored as compact hex in a JSON file.
+    Entries are keyed by their path relative to root, so the index does not depend on the
+    working directory. update() only re-hashes files whose mtime or size changed and drops
+    deleted files.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, index_path=DEFAULT_INDEX_PATH):
+        self.root = root
+        self.index_path = index_path
+        self.entries = {}
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable image index: {e}")
+
+    def update(self):
+        seen = set()
+        hashed = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                full_path = os.path.join(dirpath, filename)
+                path = os.path.normpath(os.path.relpath(full_path, self.root))
+                seen.add(path)
+                stat = os.stat(full_path)
+                entry = self.entries.get(path)
+                if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                    continue
+                try:
+                    with Image.open(full_path) as img:
+                        self.entries[path] = {
+                            "mtime": stat.st_mtime,
+                            "size": stat.st_size,
+                            "dhash": f"{dhash(img):016x}",
+                            "phash": f"{phash(img):016x}"
+                        }
+                    hashed += 1
+                except OSError as e:
+                    print(f"  Skipping unreadable image {full_path}: {e}")
+        removed = [path for path in self.entries if path not in seen]
+        for path in removed:
+            del self.entries[path]
+        self.save()
+        print(f"Image index: {len(self.entries)} images ({hashed} hashed, {len(removed)} removed)")
+
+    def save(self):
+        directory = os.path.dirname(self.index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+    def relative(self, path):
+        """path (absolute or relative to the working directory) as an index key."""
+        return os.path.normpath(os.path.relpath(os.path.abspath(path), os.path.abspath(self.root)))
+
+    def build_tree(self, exclude_dir=None):
+        tree = BKTree()
+        for path, entry in self.entries.items():
+            if exclude_dir and _is_inside(path, exclude_dir):
+                continue
+            tree.add(int(entry["phash"], 16), path)
+        return tree
+
+def find_duplicates(index, folder, threshold=DEFAULT_THRESHOLD):
+    """
+    Returns {image_in_folder: [(distance, other_path)]} for images in folder that
+    look like images in other result folders (paths relative to the index root).
+    Matches must agree on both pHash (BK-tree lookup) and dHash, which keeps false
+    positives down.
+    """
+    folder = index.relative(folder)
+    tree = index.build_tree(exclude_dir=folder)
+    duplicates = {}
+    for path, entry in sorted(index.entries.items()):
+        if not _is_inside(path, folder):
+            continue
+        d_value = int(entry["dhash"], 16)
+        matches = [
+            (distance, other) for distance, other in tree.query(int(entry["phash"], 16), threshold)
+            if hamming(d_value, int(index.entries[other]["dhash"], 16)) <= threshold
+        ]
+        if matches:
+            duplicates[path] = matches
+    return duplicates
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag images that duplicate images in other result folders.")
+    parser.add_argument("folder", help="Result folder to check (e.g. result/2026-02-09)")
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="Folder holding all result folders")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD, help="Max Hamming distance (0-64) for a near-duplicate")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.folder):
+        print(f"Error: {args.folder} is not a folder.")
+        sys.exit(1)
+    if not _is_inside(os.path.abspath(args.folder), os.path.abspath(args.root)):
+        print(f"Error: {args.folder} is not inside {args.root}.")
+        sys.exit(1)
+
+    index = ImageIndex(root=args.root)
+    index.update()
+
+    duplicates = find_duplicates(index, args.folder, threshold=args.threshold)
+    if not duplicates:
+        print("No near-duplicate images found.")
+        return
+    for path, matches in duplicates.items():
+        print(f"Near-duplicate: {os.path.join(args.root, path)}")
+        for distance, other in matches:
+            print(f"    ~ {os.path.join(args.root, other)} (distance {distance})")
+    sys.exit(2)
+
+if __name__ == "__main__":
+    main()
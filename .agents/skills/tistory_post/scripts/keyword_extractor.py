@@ -0,0 +1,246 @@
+import os
+import re
+import sys
+import time
+import argparse
+import numpy as np
+
+from document_manifest import load_manifest
+
+DEFAULT_TAG_COUNT = 10
+TEXTRANK_WINDOW = 3
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 30
+
+# Weight of a term occurrence by where it appears in the post
+WEIGHT_TITLE = 3.0
+WEIGHT_HEADING = {2: 2.0, 3: 1.5, 4: 1.2}
+WEIGHT_BOLD = 1.5
+WEIGHT_BODY = 1.0
+
+_TOKEN_RE = re.compile(r'[가-힣]+|[A-Za-z][A-Za-z0-9&+]*|\d+[A-Za-z가-힣]*')
+_SENTENCE_RE = re.compile(r'[.,!?。\n·|:;()\[\]"“”‘’]+')
+_HANGUL_RE = re.compile(r'[가-힣]')
+
+# Particles stripped from the end of Korean words, longest first ('금리를' -> '금리')
+_JOSA = sorted([
+    "은", "는", "이", "가", "을", "를", "에", "의", "와", "과", "도", "로", "으로", "에서", "에게",
+    "까지", "부터", "만", "처럼", "보다", "이나", "나", "란", "이란", "라는", "이라는", "에는",
+    "에서는", "으로는", "로는", "과의", "와의", "에도", "이며", "이고", "이다", "입니다", "이죠", "이요",
+    "들", "들이", "들은", "들을", "들의", "께서", "한테", "마저", "조차", "밖에", "뿐",
+], key=len, reverse=True)
+# Particles that also end many nouns ('우크라이나', '에세이', '역효과', '전문가',
+# '만족도'): only stripped when the stem is attested on its own in the same post (see
+# attested_stems). The other particles are always stripped.
+_AMBIGUOUS_JOSA = {"이", "가", "도", "과", "나", "이나"}
+# '의' is the particle except in these nouns ('민주주의', '회의')
+_UI_NOUNS = ("주의", "회의", "합의", "논의", "협의", "동의", "정의", "토의", "강의", "결의", "창의", "문의", "항의",
+             "예의", "의의", "편의", "호의", "모의", "성의", "경의")
+
+# Verb/adjective endings: words ending like this are predicates, not keywords
+_PREDICATE_ENDINGS = (
+    "습니다", "합니다", "입니다", "됩니다", "니다", "했다", "한다", "된다", "있다", "없다", "같다",
+    "하는", "하고", "하며", "해서", "하면", "하게", "하여", "되는", "되고", "되어", "돼서", "했던", "하던",
+    "인데", "지만", "는데", "어요", "아요", "해요", "세요", "까요", "려면", "으면", "면서", "죠",
+    "였다", "었다", "았다", "겠다", "니까", "므로", "듯이", "도록", "는지", "하지", "했지",
+)
+
+# Adnominal (modifier) endings: '새로운', '다양한', '포함된', '구체적인'. Short endings only
+# count from three syllables on, since two-syllable nouns end like them ('제한', '행운').
+_MODIFIER_ENDINGS = ("적인", "스러운", "로운", "다운", "는", "은", "던", "된", "될", "긴")
+_LONG_MODIFIER_ENDINGS = ("한", "운", "른", "할", "고")
+
+_STOPWORDS = {
+    "그리고", "하지만", "그러나", "그래서", "또한", "이번", "지금", "오늘", "우리", "여러분", "이런", "그런", "저런",
+    "어떤", "정말", "가장", "때문", "경우", "통해", "대한", "위한", "있는", "없는", "이것", "그것", "저것", "무엇",
+    "모든", "다른", "같은", "많은", "바로", "특히", "다시", "이제", "아직", "먼저", "함께", "이후", "이전", "현재",
+    "하나", "부분", "정도", "관련", "대해", "위해", "단계", "내용", "이야기", "생각", "마지막", "결론", "서론", "본문",
+    "제목", "목차", "이미지", "사진", "출처", "참고", "요약", "the", "and", "for", "with", "from", "this", "that",
+    # conjunctions and conjunctive adverbs
+    "혹은", "또는", "및", "즉", "따라서", "그러므로", "게다가", "그런데", "그러면", "그래도", "아니면", "한편",
+    "반면", "더불어", "아울러", "뿐만", "오히려", "결국", "물론", "비록", "만약", "왜냐하면", "그럼에도",
+    # two-syllable modifiers the ending rules let through
+    "아닌", "못한", "이러한", "그러한",
+    # adverbs
+    "아주", "자주", "매우", "너무", "조금", "따라",
+}
+
+def attested_stems(texts):
+    """
+    Hangul words a particle may be stripped down to: words that occur on their own in
+    texts, or before at least two different particles ('금리가' and '금리를').
+    """
+    seen, particles = set(), {}
+    for text in texts:
+        for token in _TOKEN_RE.findall(text):
+            if not _HANGUL_RE.match(token):
+                continue
+            seen.add(token)
+            for josa in _JOSA:
+                if token.endswith(josa) and len(token) > len(josa):
+                    particles.setdefault(token[:-len(josa)], set()).add(josa)
+    return seen | {stem for stem, found in particles.items() if len(found) >= 2}
+
+def normalize_word(word, stems=frozenset()):
+    """
+    Strips a trailing particle from a Korean word; particles that also end nouns only
+    if the stem is in stems (attested_stems of the post).
+    Returns (word, had_particle); word is None for predicates, modifiers, stopwords
+    and fragments.
+    """
+    had_particle = False
+    if _HANGUL_RE.match(word):
+        if word.endswith(_PREDICATE_ENDINGS):
+            return None, False
+        for josa in _JOSA:
+            if not word.endswith(josa) or len(word) == len(josa):
+                continue
+            stem = word[:-len(josa)]
+            if josa == "의" and word.endswith(_UI_NOUNS):
+                continue
+            if len(stem) < 2:
+                if stem in stems or josa == "의":
+                    # One-syllable noun + particle ('길을', '식의')
+                    return None, True
+                # Else a noun ending like a particle ('마을')
+                continue
+            if josa not in _AMBIGUOUS_JOSA or stem in stems or stem in _STOPWORDS:
+                word = stem
+                had_particle = True
+                break
+        if not had_particle and (
+            word.endswith(_MODIFIER_ENDINGS) or (len(word) >= 3 and word.endswith(_LONG_MODIFIER_ENDINGS))
+        ):
+            return None, False
+        if len(word) < 2:
+            return None, had_particle
+    elif len(word) < 2 or word.isdigit():
+        return None, False
+    if word.lower() in _STOPWORDS:
+        return None, had_particle
+    return word, had_particle
+
+def sentences(text, stems=frozenset()):
+    """
+    Splits text into sentences of candidate words. Yields (words, joinable): words has
+    None where a non-keyword sits, joinable[i] says whether words[i] and words[i + 1]
+    may form a compound (a particle after words[i] ends the noun phrase).
+    """
+    for sentence in _SENTENCE_RE.split(text):
+        normalized = [normalize_word(token, stems) for token in _TOKEN_RE.findall(sentence)]
+        words = [word for word, _ in normalized]
+        if any(words):
+            yield words, [not had_particle for _, had_particle in normalized]
+
+def weighted_segments(manifest):
+    """(text, weight) pairs: the body first, then title/headings/bold again with their extra weight."""
+    segments = [(manifest["text"], WEIGHT_BODY)]
+    if manifest["title"]:
+        segments.append((manifest["title"], WEIGHT_TITLE))
+    for heading in manifest["outline"]:
+        if heading["level"] in WEIGHT_HEADING:
+            segments.append((heading["text"], WEIGHT_HEADING[heading["level"]]))
+    segments.extend((phrase, WEIGHT_BOLD) for phrase in manifest["bold"])
+    return segments
+
+def textrank(body_sentences, vocabulary):
+    """PageRank over the co-occurrence graph of candidate words (window of TEXTRANK_WINDOW)."""
+    src, dst = [], []
+    for words, _ in body_sentences:
+        for i, word in enumerate(words):
+            if word is None:
+                continue
+            for other in words[i + 1:i + TEXTRANK_WINDOW]:
+                if other is not None and other != word:
+                    a, b = vocabulary[word], vocabulary[other]
+                    src.extend((a, b))
+                    dst.extend((b, a))
+    n = len(vocabulary)
+    rank = np.full(n, 1.0 / n)
+    if not src:
+        return rank
+    src = np.asarray(src)
+    dst = np.asarray(dst)
+    out_degree = np.bincount(src, minlength=n).astype(np.float64)
+    for _ in range(TEXTRANK_ITERATIONS):
+        rank = (1 - TEXTRANK_DAMPING) / n + TEXTRANK_DAMPING * np.bincount(dst, weights=rank[src] / out_degree[src], minlength=n)
+    return rank
+
+def extract_keywords(manifest, count=DEFAULT_TAG_COUNT):
+    """
+    Returns up to count (keyword, score) pairs, best first.
+    Candidates are Korean/English words (particles stripped) and adjacent word pairs.
+    Word score = TextRank centrality x log(1 + heading-weighted frequency). A pair
+    seen at least twice scores the mean of its two words, boosted by how often the
+    words occur together (cohesion), so '금리 인상' beats '금리' and '인상' alone.
+    """
+    segments = weighted_segments(manifest)
+    stems = attested_stems(text for text, _ in segments)
+    term_weight = {}
+    pair_count = {}  # occurrences in the body only: a heading alone does not make a compound
+    for segment, (text, weight) in enumerate(segments):
+        for words, joinable in sentences(text, stems):
+            for i, word in enumerate(words):
+                if word is None:
+                    continue
+                term_weight[word] = term_weight.get(word, 0.0) + weight
+                if joinable[i] and i + 1 < len(words) and words[i + 1] is not None and words[i + 1] != word:
+                    pair = (word, words[i + 1])
+                    term_weight[pair] = term_weight.get(pair, 0.0) + weight
+                    if segment == 0:
+                        pair_count[pair] = pair_count.get(pair, 0) + 1
+    if not term_weight:
+        return []
+
+    vocabulary = {}
+    for term in term_weight:
+        if isinstance(term, str):
+            vocabulary.setdefault(term, len(vocabulary))
+    centrality = textrank(list(sentences(manifest["text"], stems)), vocabulary)
+    centrality = centrality / centrality.max()
+
+    scores = {term: centrality[vocabulary[term]] * np.log1p(weight) for term, weight in term_weight.items() if isinstance(term, str)}
+    for pair, occurrences in pair_count.items():
+        if occurrences < 2:
+            continue
+        a, b = pair
+        cohesion = term_weight[pair] / min(term_weight[a], term_weight[b])
+        scores[a + b] = max(scores.get(a + b, 0.0), (scores[a] + scores[b]) / 2 * (1 + cohesion))
+
+    picked = []
+    for term, score in sorted(scores.items(), key=lambda item: -item[1]):
+        # Skip terms overlapping an already picked tag ('금리' vs '금리인상')
+        if any(term in other or other in term for other, _ in picked):
+            continue
+        picked.append((term, float(score)))
+        if len(picked) == count:
+            break
+    return picked
+
+def extract_hashtags(manifest, count=DEFAULT_TAG_COUNT):
+    """Hashtag line in the same format as the Gemini engine: '#키워드1 #키워드2 ...'."""
+    return " ".join(f"#{keyword}" for keyword, _ in extract_keywords(manifest, count))
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract hashtags from a blog post offline (no API call).")
+    parser.add_argument("html_path", help="Path to the blog post HTML file")
+    parser.add_argument("--count", type=int, default=DEFAULT_TAG_COUNT, help="Number of hashtags")
+    parser.add_argument("--scores", action="store_true", help="Print the score of every keyword")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.html_path):
+        print(f"HTML file not found: {args.html_path}")
+        sys.exit(1)
+
+    manifest = load_manifest(args.html_path)
+    start = time.perf_counter()
+    keywords = extract_keywords(manifest, args.count)
+    elapsed = time.perf_counter() - start
+    if args.scores:
+        for keyword, score in keywords:
+            print(f"  {score:.3f}  {keyword}")
+    print(" ".join(f"#{keyword}" for keyword, _ in keywords))
+    print(f"Extracted {len(keywords)} keywords in {elapsed * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import re
+import html
+import zlib
+import random
+
+DEFAULT_THRESHOLD = 0.5
+NUM_PERM = 32
+BANDS = 16  # 16 bands x 2 rows: pairs with Jaccard >= 0.5 become candidates ~99% of the time
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1234)  # fixed seed: identical signatures on every run
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+_TAG_RE = re.compile(r'<[^>]+>')
+# Google News descriptions end with <font color="#6f6f6f">Publisher</font>
+_PUBLISHER_RE = re.compile(r'<font\b[^>]*>(.*?)</font>', re.IGNORECASE | re.DOTALL)
+_NON_WORD_RE = re.compile(r'[^\w]+')
+
+def normalize_title(title):
+    """
+    Lowercase words without punctuation. Google News titles end with
+    " - <Publisher>", which is dropped so the same story from two outlets compares equal.
+    """
+    title = title or ""
+    if " - " in title:
+        title = title.rsplit(" - ", 1)[0]
+    return _NON_WORD_RE.sub(' ', title.lower()).strip()
+
+def publisher(item):
+    """Lowercased outlet name: the description's <font> text, else the " - <Publisher>" title suffix."""
+    match = _PUBLISHER_RE.search(html.unescape(item.get('description') or ""))
+    if match:
+        return _TAG_RE.sub('', match.group(1)).strip().lower()
+    title = item.get('title') or ""
+    return title.rsplit(" - ", 1)[1].strip().lower() if " - " in title else ""
+
+def normalize_text(item):
+    """
+    Normalized title + description (HTML and the publisher name stripped). A description
+    that only repeats the title (the usual Google News case) is left out, so it does not
+    double the weight of the title.
+    """
+    title = normalize_title(item.get('title'))
+    description = _PUBLISHER_RE.sub(' ', html.unescape(item.get('description') or ""))
+    description = _NON_WORD_RE.sub(' ', html.unescape(_TAG_RE.sub(' ', description)).lower()).strip()
+    if not description or description in title:
+        return title
+    return f"{title} {description}".strip()
+
+def shingles(text):
+    """Character n-grams (spaces removed), which also work for Korean without a tokenizer."""
+    compact = text.replace(' ', '')
+    if len(compact) <= SHINGLE_SIZE:
+        return {compact} if compact else set()
+    return {compact[i:i + SHINGLE_SIZE] for i in range(len(compact) - SHINGLE_SIZE + 1)}
+
+def minhash(shingle_set):
+    hashes = [zlib.crc32(s.encode('utf-8')) for s in shingle_set]
+    if not hashes:
+        return None
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def _same_outlet_conflict(outlets_a, outlets_b):
+    """True if both clusters have items of one publisher and their titles differ."""
+    return any(
+        name in outlets_b and (len(titles | outlets_b[name]) > 1)
+        for name, titles in outlets_a.items()
+    )
+
+def cluster_news(items, threshold=DEFAULT_THRESHOLD):
+    """
+    Groups near-duplicate news items and returns one representative per cluster.
+
+    MinHash signatures are bucketed with LSH banding, so only items sharing a
+    band are compared (instead of all pairs); candidates are then confirmed with
+    the exact Jaccard similarity of their shingle sets.
+
+    Two clusters are not merged when they hold items of the same publisher with
+    different titles: an outlet does not re-run its own story under a new headline,
+    and its headlines share wording ("... earnings slow down") across unrelated stories.
+
+    The representative is the first item of the cluster in input order, so the
+    result is deterministic. Other members are attached as 'sources'
+    ({title, link, pubDate}) when a cluster has more than one item.
+    """
+    shingle_sets = [shingles(normalize_text(item)) for item in items]
+    # Per cluster root: {publisher: {normalized titles}}
+    outlets = {}
+    for i, item in enumerate(items):
+        name = publisher(item)
+        outlets[i] = {name: {normalize_title(item.get('title'))}} if name else {}
+    parent = list(range(len(items)))
+
+    buckets = {}
+    for i, shingle_set in enumerate(shingle_sets):
+        signature = minhash(shingle_set)
+        if signature is None:
+            continue
+        for band in range(BANDS):
+            key = (band, signature[band * ROWS:(band + 1) * ROWS])
+            buckets.setdefault(key, []).append(i)
+
+    checked = set()
+    for members in buckets.values():
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                a, b = members[x], members[y]
+                root_a, root_b = _find(parent, a), _find(parent, b)
+                if root_a == root_b or (a, b) in checked:
+                    continue
+                checked.add((a, b))
+                if _same_outlet_conflict(outlets[root_a], outlets[root_b]):
+                    continue
+                if jaccard(shingle_sets[a], shingle_sets[b]) >= threshold:
+                    keep, merged = min(root_a, root_b), max(root_a, root_b)
+                    parent[merged] = keep
+                    for name, titles in outlets.pop(merged).items():
+                        outlets[keep].setdefault(name, set()).update(titles)
+
+    clusters = {}
+    for i in range(len(items)):
+        clusters.setdefault(_find(parent, i), []).append(i)
+
+    result = []
+    for root in sorted(clusters):
+        members = clusters[root]
+        representative = dict(items[members[0]])
+        if len(members) > 1:
+            representative['sources'] = [
+                {'title': items[m].get('title'), 'link': items[m].get('link'), 'pubDate': items[m].get('pubDate')}
+                for m in members[1:]
+            ]
+        result.append(representative)
+    return result
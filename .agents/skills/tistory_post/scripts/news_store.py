@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import urllib.parse
+from email.utils import parsedate_tz, mktime_tz
+
+from news_dedupe import normalize_title
+
+DEFAULT_DB_PATH = os.path.join(".tmp", "news.db")
+# A link-less item only merges with a same-title item from the same source published this close
+TITLE_MATCH_WINDOW = 24 * 60 * 60
+# Title fetch_news.parse_news gives items without one; never used for matching
+PLACEHOLDER_TITLE = "No Title"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    id INTEGER PRIMARY KEY,
+    link TEXT,
+    title TEXT,
+    title_hash TEXT NOT NULL,
+    source TEXT,
+    description TEXT,
+    pub_date TEXT,
+    pub_ts INTEGER,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_news_link ON news(link);
+CREATE INDEX IF NOT EXISTS idx_news_title_hash ON news(title_hash);
+CREATE INDEX IF NOT EXISTS idx_news_pub_ts ON news(pub_ts);
+
+-- Which stories were already handed to the agent for a given blog alias
+CREATE TABLE IF NOT EXISTS emitted (
+    alias TEXT NOT NULL,
+    news_id INTEGER NOT NULL REFERENCES news(id),
+    emitted_at REAL NOT NULL,
+    PRIMARY KEY (alias, news_id)
+);
+"""
+
+def title_hash(title):
+    return hashlib.sha1(normalize_title(title).encode("utf-8")).hexdigest()
+
+def news_source(item):
+    """Publisher of an item: the " - <Publisher>" suffix of Google News titles, else the link's host."""
+    title = item.get("title") or ""
+    if " - " in title:
+        return title.rsplit(" - ", 1)[1].strip().lower()
+    return (urllib.parse.urlsplit(item.get("link") or "").hostname or "").lower()
+
+def pub_timestamp(pub_date_str):
+    parsed = parsedate_tz(pub_date_str) if pub_date_str else None
+    return mktime_tz(parsed) if parsed is not None else None
+
+class NewsStore:
+    """
+    Local SQLite store of every news item fetched so far.
+
+    Items are matched by link first. Without a link match, an item with a real title
+    matches a row with the same normalized title hash, the same source, and a pub date
+    within TITLE_MATCH_WINDOW, so the same story re-fetched later in the day maps to the
+    same row. Two outlets running the same headline stay separate.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(news)")}
+        if "source" not in columns:
+            # Stores created before the column existed
+            self.conn.execute("ALTER TABLE news ADD COLUMN source TEXT")
+
+    def close(self):
+        self.conn.close()
+
+    def _find(self, link, item, t_hash, source, pub_ts):
+        row = None
+        if link:
+            row = self.conn.execute("SELECT id FROM news WHERE link = ?", (link,)).fetchone()
+        title = (item.get("title") or "").strip()
+        if row is None and title and title != PLACEHOLDER_TITLE and normalize_title(title) and source and pub_ts is not None:
+            row = self.conn.execute(
+                "SELECT id FROM news WHERE title_hash = ? AND source = ? AND pub_ts BETWEEN ? AND ? LIMIT 1",
+                (t_hash, source, pub_ts - TITLE_MATCH_WINDOW, pub_ts + TITLE_MATCH_WINDOW)
+            ).fetchone()
+        return row["id"] if row else None
+
+    def _upsert_one(self, item, now):
+        link = item.get("link") or None
+        t_hash = title_hash(item.get("title"))
+        source = news_source(item)
+        pub_ts = pub_timestamp(item.get("pubDate"))
+        news_id = self._find(link, item, t_hash, source, pub_ts)
+        if news_id is not None:
+            self.conn.execute("UPDATE news SET last_seen = ? WHERE id = ?", (now, news_id))
+            return news_id
+        cur = self.conn.execute(
+            "INSERT INTO news (link, title, title_hash, source, description, pub_date, pub_ts, first_seen, last_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (link, item.get("title"), t_hash, source or None, item.get("description"), item.get("pubDate"),
+             pub_ts, now, now)
+        )
+        return cur.lastrowid
+
+    def upsert(self, items):
+        """
+        Inserts new items and refreshes last_seen for known ones.
+        Clustered items also store their 'sources'. Returns, in input order, the
+        row ids of each item: [representative_id, *source_ids].
+        """
+        now = time.time()
+        ids = []
+        with self.conn:
+            for item in items:
+                item_ids = [self._upsert_one(item, now)]
+                for source in item.get("sources", []):
+                    item_ids.append(self._upsert_one(source, now))
+                ids.append(item_ids)
+        return ids
+
+    def emitted_ids(self, alias, ids):
+        """Returns the subset of ids that were already emitted for alias."""
+        if not ids:
+            return set()
+        placeholders = ",".join("?" * len(ids))
+        rows = self.conn.execute(
+            f"SELECT news_id FROM emitted WHERE alias = ? AND news_id IN ({placeholders})",
+            [alias] + list(ids)
+        ).fetchall()
+        return {row["news_id"] for row in rows}
+
+    def mark_emitted(self, alias, ids):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO emitted (alias, news_id, emitted_at) VALUES (?, ?, ?)",
+                [(alias, news_id, now) for news_id in ids]
+            )
+
+    def search(self, keyword=None, hours=24, limit=50):
+        """Keyword (title/description) and recency query, newest first."""
+        sql = "SELECT link, title, pub_date, description FROM news WHERE pub_ts >= ?"
+        params = [int(time.time() - hours * 3600)]
+        if keyword:
+            sql += " AND (title LIKE ? OR description LIKE ?)"
+            params += [f"%{keyword}%", f"%{keyword}%"]
+        sql += " ORDER BY pub_ts DESC LIMIT ?"
+        params.append(limit)
+        return [
+            {"title": row["title"], "link": row["link"], "pubDate": row["pub_date"], "description": row["description"]}
+            for row in self.conn.execute(sql, params)
+        ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the local news store filled by fetch_news.py")
+    parser.add_argument("keyword", nargs="?", help="Keyword to match in title/description (omit for all)")
+    parser.add_argument("--hours", type=float, default=24, help="Only items published within the last N hours")
+    parser.add_argument("--limit", type=int, default=50, help="Maximum number of items")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Path to the SQLite store")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Error: {args.db} not found. Run fetch_news.py first.")
+        sys.exit(1)
+
+    store = NewsStore(args.db)
+    try:
+        results = store.search(args.keyword, hours=args.hours, limit=args.limit)
+    finally:
+        store.close()
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
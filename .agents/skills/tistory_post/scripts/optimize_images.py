@@ -0,0 +1,207 @@
+import os
+import sys
+import shutil
+import argparse
+from PIL import Image, ImageOps
+
+from document_manifest import load_manifest, image_ref_patches, apply_patches
+
+# Tistory/Naver content columns render images at most ~900px wide
+DEFAULT_MAX_WIDTH = 1000
+DEFAULT_QUALITY = 82
+FORMATS = {"jpeg": ("JPEG", ".jpg"), "webp": ("WEBP", ".webp")}
+OPTIMIZABLE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+METADATA_KEYS = ("exif", "icc_profile", "xmp", "comment")
+EXIF_ORIENTATION = 0x0112
+# APP1-APP15 (EXIF, ICC, XMP, IPTC, ...) and COM; APP0 (JFIF) is kept
+_JPEG_METADATA_MARKERS = set(range(0xE1, 0xF0)) | {0xFE}
+
+def optimize_image(src_path, dst_path, fmt="jpeg", max_width=DEFAULT_MAX_WIDTH, quality=DEFAULT_QUALITY):
+    """
+    Re-encodes one image: downscales to max_width, drops metadata (EXIF/ICC/text chunks
+    are not copied over) and saves as quality-tuned JPEG or WebP.
+    Returns (original_bytes, optimized_bytes).
+    """
+    pil_format, _ = FORMATS[fmt]
+    with Image.open(src_path) as img:
+        img.load()
+        # Metadata is dropped, so bake the EXIF rotation into the pixels first
+        img = ImageOps.exif_transpose(img)
+        if img.width > max_width:
+            height = round(img.height * max_width / img.width)
+            img = img.resize((max_width, height), Image.LANCZOS)
+        if img.mode not in ("RGB", "L"):
+            # JPEG has no alpha; flatten on white like the blog background
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            rgba = img.convert("RGBA")
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            img = background
+
+        tmp_path = f"{dst_path}.tmp"
+        save_args = {"quality": quality}
+        if pil_format == "JPEG":
+            save_args.update(optimize=True, progressive=True)
+        else:
+            save_args.update(method=6)
+        img.save(tmp_path, pil_format, **save_args)
+    os.replace(tmp_path, dst_path)
+    return os.path.getsize(src_path), os.path.getsize(dst_path)
+
+def strip_jpeg_metadata(path):
+    """
+    Removes the metadata segments of a JPEG in place without re-encoding it (no quality loss).
+    Returns (original_bytes, stripped_bytes); both are equal when there was nothing to strip.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:2] != b"\xff\xd8":
+        raise ValueError(f"Not a JPEG file: {path}")
+    kept = [data[:2]]
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            raise ValueError(f"Corrupt JPEG marker at byte {position}: {path}")
+        marker = data[position + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            position += 1
+            continue
+        if marker in (0xDA, 0xD9):
+            # Start of scan / end of image: the rest is image data
+            break
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            kept.append(data[position:position + 2])
+            position += 2
+            continue
+        length = int.from_bytes(data[position + 2:position + 4], "big")
+        if marker not in _JPEG_METADATA_MARKERS:
+            kept.append(data[position:position + 2 + length])
+        position += 2 + length
+    kept.append(data[position:])
+    stripped = b"".join(kept)
+    if len(stripped) != len(data):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(stripped)
+        os.replace(tmp_path, path)
+    return len(data), len(stripped)
+
+def _image_key(base_dir, src):
+    return os.path.normcase(os.path.normpath(os.path.join(base_dir, src)))
+
+def _output_src(base_dir, stem, ext, src_path, taken):
+    """
+    stem + ext, or stem-1 + ext, stem-2 + ext, ... when that name already belongs to another
+    image (an existing file, one referenced by the post, or an output of this run).
+    """
+    candidate, suffix = stem + ext, 1
+    while True:
+        key = _image_key(base_dir, candidate)
+        if key == os.path.normcase(src_path) or (key not in taken and not os.path.exists(key)):
+            return candidate
+        candidate = f"{stem}-{suffix}{ext}"
+        suffix += 1
+
+def optimize_html_images(html_path, fmt="jpeg", max_width=DEFAULT_MAX_WIDTH, quality=DEFAULT_QUALITY, keep_originals=False):
+    """
+    Optimizes every local image referenced by html_path and points the <img> src
+    (and lazy-load attributes repeating it, e.g. data-src) at the new files. Only those
+    values are patched; the rest of the HTML is left byte-for-byte untouched.
+    """
+    if not os.path.exists(html_path):
+        print(f"HTML file not found: {html_path}")
+        return
+
+    base_dir = os.path.dirname(html_path)
+    _, target_ext = FORMATS[fmt]
+    manifest = load_manifest(html_path)
+    images = [image for image in manifest["images"] if image["src"]]
+    # A file is only replaced if every reference to it can be patched
+    unpatchable = {image["src"] for image in images if image["src_span"] is None}
+    for src in unpatchable:
+        print(f"  Warning: Source position of <img src=\"{src}\"> is unknown; leaving it as is")
+
+    srcs = [image["src"] for image in images]
+    # Output names must not land on another image of the post (chart.png and chart.jpg -> chart.jpg)
+    taken = {_image_key(base_dir, src) for src in srcs}
+    renamed = {}
+    total_before = total_after = 0
+    for src in dict.fromkeys(srcs):
+        if src in renamed or src in unpatchable or src.startswith(("http:", "https:", "//", "data:")):
+            continue
+        stem, ext = os.path.splitext(src)
+        if ext.lower() not in OPTIMIZABLE_EXTENSIONS:
+            continue
+        src_path = os.path.normpath(os.path.join(base_dir, src))
+
+        if not os.path.exists(src_path):
+            new_src = stem + target_ext
+            if _image_key(base_dir, new_src) not in taken and os.path.exists(os.path.join(base_dir, new_src)):
+                # Optimized by an earlier run; just fix the reference
+                renamed[src] = new_src
+            else:
+                print(f"  Warning: Image file not found: {src_path}")
+            continue
+
+        new_src = _output_src(base_dir, stem, target_ext, src_path, taken)
+        dst_path = os.path.normpath(os.path.join(base_dir, new_src))
+        taken.add(_image_key(base_dir, new_src))
+
+        if src_path == dst_path:
+            with Image.open(src_path) as img:
+                fits = img.width <= max_width and img.getexif().get(EXIF_ORIENTATION, 1) == 1
+                is_jpeg = img.format == "JPEG"
+                has_metadata = any(key in img.info for key in METADATA_KEYS)
+            if fits and is_jpeg:
+                # Right size already: strip the metadata losslessly instead of re-encoding
+                before, after = strip_jpeg_metadata(src_path)
+                if before == after:
+                    print(f"  Already optimized: {src}")
+                else:
+                    total_before += before
+                    total_after += after
+                    print(f"  {src}: metadata stripped, {before // 1024} KiB -> {after // 1024} KiB")
+                continue
+            if fits and not has_metadata:
+                print(f"  Already optimized: {src}")
+                continue
+
+        before, after = optimize_image(src_path, dst_path, fmt=fmt, max_width=max_width, quality=quality)
+        total_before += before
+        total_after += after
+        print(f"  {src} -> {new_src}: {before // 1024} KiB -> {after // 1024} KiB")
+
+        if src_path != dst_path:
+            if keep_originals:
+                originals_dir = os.path.join(base_dir, "originals")
+                os.makedirs(originals_dir, exist_ok=True)
+                shutil.move(src_path, os.path.join(originals_dir, os.path.basename(src_path)))
+            else:
+                os.remove(src_path)
+            renamed[src] = new_src
+
+    if renamed:
+        patches = [patch for image in images if image["src"] in renamed for patch in image_ref_patches(image, renamed[image["src"]])]
+        apply_patches(html_path, manifest, patches)
+        print(f"Updated {len(renamed)} image references in {html_path}")
+
+    if total_before:
+        print(f"Total: {total_before // 1024} KiB -> {total_after // 1024} KiB ({100 - total_after * 100 // total_before}% smaller)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize the images of a blog post before upload.")
+    parser.add_argument("html_path", help="Path to the blog post HTML file")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="jpeg", help="Output format (default: jpeg)")
+    parser.add_argument("--max-width", type=int, default=DEFAULT_MAX_WIDTH, help="Downscale images wider than this (px)")
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY, help="Encoder quality (1-100)")
+    parser.add_argument("--keep-originals", action="store_true", help="Move the original files to an 'originals' subfolder instead of deleting them")
+    args = parser.parse_args()
+
+    if not 1 <= args.quality <= 100:
+        print("Error: --quality must be between 1 and 100.")
+        sys.exit(1)
+
+    optimize_html_images(args.html_path, fmt=args.format, max_width=args.max_width, quality=args.quality, keep_originals=args.keep_originals)
+
+if __name__ == "__main__":
+    main()
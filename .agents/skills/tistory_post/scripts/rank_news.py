@@ -0,0 +1,142 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from scipy import sparse
+
+from news_dedupe import normalize_text
+from news_store import pub_timestamp
+
+DEFAULT_TOP_K = 20
+DEFAULT_OUTPUT = os.path.join(".tmp", "news_top.json")
+RECENCY_HALF_LIFE_HOURS = 6
+
+# Weights of the three signals (each signal is scaled to 0..1)
+WEIGHT_TOPIC = 0.5
+WEIGHT_RECENCY = 0.3
+WEIGHT_COVERAGE = 0.2
+
+_HANGUL_RE = re.compile(r'[가-힣]')
+
+def tokenize(text):
+    """
+    Words plus character bigrams of Korean words. Bigrams let '글로벌경제'
+    match '경제' and '글로벌' without a morphological analyzer.
+    """
+    tokens = []
+    for word in text.split():
+        tokens.append(word)
+        if len(word) > 2 and _HANGUL_RE.search(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+def tfidf_matrix(documents):
+    """
+    Builds an L2-normalized TF-IDF CSR matrix (sublinear tf, smoothed idf).
+    Returns (matrix, vocabulary, idf).
+    """
+    vocabulary = {}
+    rows, cols, values = [], [], []
+    for row, tokens in enumerate(documents):
+        counts = {}
+        for token in tokens:
+            col = vocabulary.setdefault(token, len(vocabulary))
+            counts[col] = counts.get(col, 0) + 1
+        rows.extend([row] * len(counts))
+        cols.extend(counts.keys())
+        values.extend(counts.values())
+
+    tf = sparse.csr_matrix(
+        (np.asarray(values, dtype=np.float64), (rows, cols)),
+        shape=(len(documents), len(vocabulary))
+    )
+    tf.data = 1.0 + np.log(tf.data)
+    document_frequency = np.bincount(tf.indices, minlength=len(vocabulary))
+    idf = np.log((1.0 + len(documents)) / (1.0 + document_frequency)) + 1.0
+    return _l2_normalize(tf @ sparse.diags(idf)), vocabulary, idf
+
+def _l2_normalize(matrix):
+    matrix = sparse.csr_matrix(matrix)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+def topic_vector(topics, vocabulary, idf):
+    """Projects the topic keywords onto the news vocabulary (unknown tokens are ignored)."""
+    vector = np.zeros(len(vocabulary))
+    for topic in topics:
+        for token in tokenize(normalize_text({'title': topic})):
+            col = vocabulary.get(token)
+            if col is not None:
+                vector[col] += idf[col]
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def rank_news(items, topics, top_k=DEFAULT_TOP_K, now=None):
+    """
+    Scores items by similarity to the topics, recency and cross-source coverage
+    and returns the top_k items (highest first) with their score breakdown.
+    """
+    if not items:
+        return []
+    now = now if now is not None else time.time()
+
+    matrix, vocabulary, idf = tfidf_matrix([tokenize(normalize_text(item)) for item in items])
+    topic_scores = matrix @ topic_vector(topics, vocabulary, idf)
+
+    ages_hours = np.array([
+        max(0.0, (now - ts) / 3600.0) if ts is not None else 24.0
+        for ts in (pub_timestamp(item.get('pubDate')) for item in items)
+    ])
+    recency_scores = np.power(0.5, ages_hours / RECENCY_HALF_LIFE_HOURS)
+
+    coverage = np.log1p(np.array([len(item.get('sources', [])) for item in items], dtype=np.float64))
+    coverage_scores = coverage / coverage.max() if coverage.max() > 0 else coverage
+
+    scores = WEIGHT_TOPIC * topic_scores + WEIGHT_RECENCY * recency_scores + WEIGHT_COVERAGE * coverage_scores
+    # Stable sort on -score keeps input order for ties
+    order = np.argsort(-scores, kind='stable')[:top_k]
+
+    ranked = []
+    for rank, index in enumerate(order, start=1):
+        item = dict(items[index])
+        item['rank'] = rank
+        item['score'] = round(float(scores[index]), 4)
+        item['score_detail'] = {
+            'topic': round(float(topic_scores[index]), 4),
+            'recency': round(float(recency_scores[index]), 4),
+            'coverage': round(float(coverage_scores[index]), 4)
+        }
+        ranked.append(item)
+    return ranked
+
+def write_top_news(items, topics, output_file=DEFAULT_OUTPUT, top_k=DEFAULT_TOP_K):
+    ranked = rank_news(items, topics, top_k=top_k)
+    directory = os.path.dirname(output_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(ranked, f, ensure_ascii=False, indent=2)
+    print(f"Saved top {len(ranked)} ranked news items to {output_file}")
+    return ranked
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank fetched news and write a compact top-K file")
+    parser.add_argument("topics", nargs="+", help="Topic keywords to score against (e.g. the alias default topics)")
+    parser.add_argument("--input", default=os.path.join(".tmp", "news_data.json"), help="News file written by fetch_news.py")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the ranked top-K file")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="Number of items to keep")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"Error: {args.input} not found. Run fetch_news.py first.")
+        sys.exit(1)
+    with open(args.input, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    write_top_news(items, args.topics, output_file=args.output, top_k=args.top_k)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
 import os
 import time
-import requests
 import re
 import sys
-from bs4 import BeautifulSoup
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from gemini_client import get_client, RetryPolicy, CircuitOpenError
+from image_cache import ImageCache, DEFAULT_MAX_BYTES
+from document_manifest import load_manifest, src_patch, apply_patches
 
 # Load environment variables
 load_dotenv()
@@ -13,17 +16,23 @@ API_KEY = os.getenv("GOOGLE_API_KEY")
 if not API_KEY:
     raise ValueError("GOOGLE_API_KEY not found in .env file")
 
-def generate_image_with_gemini(prompt, output_path):
+IMAGE_MODEL = "imagen-4.0-generate-001"
+IMAGE_ASPECT_RATIO = "16:9"
+DEFAULT_WORKERS = 4
+
+def write_file_atomic(path, data):
+    """Writes to a temp file next to path and renames it, so a crash never leaves a half-written image."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def generate_image_with_gemini(prompt, output_path, policy=None):
     """
     Generates an image using Google Gemini (Imagen 3/4) API via REST.
+    Transient errors (429/5xx/network) are retried by the shared client according to policy.
     """
-    # Using 'imagen-4.0-generate-001' as it was found in the model list
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/imagen-4.0-generate-001:predict?key={API_KEY}"
-    
-    headers = {
-        "Content-Type": "application/json"
-    }
-    
     payload = {
         "instances": [
             {
@@ -32,13 +41,13 @@ def generate_image_with_gemini(prompt, output_path):
         ],
         "parameters": {
             "sampleCount": 1,
-            "aspectRatio": "16:9" 
+            "aspectRatio": IMAGE_ASPECT_RATIO
         }
     }
 
     try:
         print(f"Generating image for prompt: '{prompt}'...")
-        response = requests.post(url, headers=headers, json=payload)
+        response = get_client().post_with_retry(IMAGE_MODEL, "predict", payload, policy=policy)
         
         if response.status_code == 200:
             result = response.json()
@@ -54,65 +63,70 @@ def generate_image_with_gemini(prompt, output_path):
                     import base64
                     image_data = base64.b64decode(image_data_b64)
                     
-                    # Ensure directory exists
-                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                    
-                    with open(output_path, "wb") as f:
-                        f.write(image_data)
+                    write_file_atomic(output_path, image_data)
                     print(f"Successfully saved image to: {output_path}")
                     return True
             print(f"Failed to extract image from response: {result}")
             return False
             
-        elif response.status_code == 429:
-            print("Quota exceeded (429). Waiting for 60 seconds before retrying...")
-            time.sleep(60)
-            return generate_image_with_gemini(prompt, output_path) # Recursive retry
-            
         else:
             print(f"Error: {response.status_code}, {response.text}")
             return False
             
+    except CircuitOpenError as e:
+        print(f"Skipping image generation: {e}")
+        return False
     except Exception as e:
         print(f"Exception during image generation: {e}")
         return False
 
-def process_html_for_images(html_path):
+def generate_or_reuse(prompt, image_path, cache=None, reuse_similar=False, policy=None):
+    if cache is not None and cache.fetch(prompt, IMAGE_MODEL, IMAGE_ASPECT_RATIO, image_path, similar=reuse_similar):
+        print(f"Reused cached image for prompt: '{prompt}' -> {image_path}")
+        return True
+    if not generate_image_with_gemini(prompt, image_path, policy=policy):
+        print(f"Failed to generate {os.path.basename(image_path)}.")
+        return False
+    if cache is not None:
+        cache.store(prompt, IMAGE_MODEL, IMAGE_ASPECT_RATIO, image_path)
+    return True
+
+def process_html_for_images(html_path, workers=DEFAULT_WORKERS, cache=None, reuse_similar=False, policy=None):
     if not os.path.exists(html_path):
         print(f"HTML file not found: {html_path}")
         return
 
-    with open(html_path, 'r', encoding='utf-8') as f:
-        soup = BeautifulSoup(f.read(), 'html.parser')
-
-    img_tags = soup.find_all('img')
+    manifest = load_manifest(html_path)
     base_dir = os.path.dirname(html_path)
     
-    html_modified = False
+    patches = [] # targeted src rewrites, applied in one write at the end
+    missing = [] # (prompt, image_path)
 
-    for i, img in enumerate(img_tags):
-        src = img.get('src')
-        alt = img.get('alt', '')
-        prompt = img.get('data-prompt', alt) 
+    for i, img in enumerate(manifest["images"]):
+        src = img["src"]
+        prompt = img["prompt"]
         
         if not src:
             continue
         
         # Determine target local filename
         # If it's already a local file, use it. If it's external/placeholder, create a new name.
-        if src.startswith("http") or src.startswith("https"):
-            # It's an external URL (placeholder), so we want to save it locally
-            filename = f"image_{i+1}.png" # e.g., image_1.png
-            img['src'] = filename
-            html_modified = True
-            print(f"Mapped external src '{src}' to local file '{filename}'")
-        elif "images/" in src or "images\\" in src:
-             # Fix old 'images/' path
-             filename = os.path.basename(src)
-             img['src'] = filename
-             html_modified = True
-        else:
-             filename = os.path.basename(src)
+        try:
+            if src.startswith("http") or src.startswith("https"):
+                # It's an external URL (placeholder), so we want to save it locally
+                filename = f"image_{i+1}.png" # e.g., image_1.png
+                patches.append(src_patch(img, filename))
+                print(f"Mapped external src '{src}' to local file '{filename}'")
+            elif "images/" in src or "images\\" in src:
+                 # Fix old 'images/' path
+                 filename = os.path.basename(src)
+                 patches.append(src_patch(img, filename))
+            else:
+                 filename = os.path.basename(src)
+        except ValueError as e:
+            # The src cannot be rewritten in place, so a generated file would stay unreferenced
+            print(f"Skipping image {i+1}: {e}")
+            continue
 
         # Construct full local path (flat structure: same as HTML)
         image_path = os.path.normpath(os.path.join(base_dir, filename))
@@ -130,29 +144,42 @@ def process_html_for_images(html_path):
                     os.rmdir(os.path.dirname(old_image_path))
                 except:
                     pass
-            else:
+            elif image_path not in [path for _, path in missing]:
                 print(f"Missing image: {image_path}")
                 print(f"Prompt: {prompt}")
-                
-                # Simple retry loop
-                max_retries = 3
-                for attempt in range(max_retries):
-                    success = generate_image_with_gemini(prompt, image_path)
-                    if success:
-                        break
-                    else:
-                        print(f"Retry {attempt + 1}/{max_retries} failed.")
-                        time.sleep(5)
+                missing.append((prompt, image_path))
 
-    if html_modified:
-        with open(html_path, 'w', encoding='utf-8') as f:
-            f.write(str(soup))
+    if missing:
+        # Submit every missing image at once; the shared client's rate limiter paces the actual calls
+        print(f"Generating {len(missing)} missing images with up to {workers} workers...")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            results = list(executor.map(lambda job: generate_or_reuse(*job, cache=cache, reuse_similar=reuse_similar, policy=policy), missing))
+        print(f"Generated {sum(results)}/{len(missing)} images in {time.perf_counter() - start:.1f}s.")
+        if cache is not None:
+            print(f"Image cache: hits={cache.hits}, misses={cache.misses}")
+
+    # Single in-place patch of the changed src values at the end
+    if patches:
+        apply_patches(html_path, manifest, patches)
         print(f"Updated HTML file with flat image paths: {html_path}")
 
+    if get_client().stats:
+        print("\n[Gemini API]")
+        print(get_client().summary())
+
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Retry missing images for a blog post.")
     parser.add_argument("html_path", help="Path to the blog post HTML file")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Max images generated concurrently")
+    parser.add_argument("--no-image-cache", action="store_true", help="Always call the API, even if this prompt was generated before")
+    parser.add_argument("--reuse-similar", action="store_true", help="Also reuse cached images whose prompt matches after normalization (case, punctuation, spacing)")
+    parser.add_argument("--max-attempts", type=int, default=5, help="Attempts per image on 429/5xx/network errors (exponential backoff with jitter)")
+    parser.add_argument("--deadline", type=float, default=300, help="Give up retrying an image after this many seconds")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), help="Size cap of the shared image cache (LRU eviction)")
     
     args = parser.parse_args()
-    process_html_for_images(args.html_path)
+    cache = None if args.no_image_cache else ImageCache(max_bytes=args.cache_max_mb * 1024 * 1024)
+    policy = RetryPolicy(max_attempts=args.max_attempts, deadline=args.deadline)
+    process_html_for_images(args.html_path, workers=args.workers, cache=cache, reuse_similar=args.reuse_similar, policy=policy)
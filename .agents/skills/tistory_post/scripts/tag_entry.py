@@ -0,0 +1,67 @@
+"""
+Bulk hashtag entry for the publish forms of the Selenium uploaders.
+
+All tags are typed into the tag input by one injected script: for each tag it
+sets the value through the native setter (so React-style inputs notice), fires
+`input`, then an Enter keydown/keypress/keyup with the legacy keyCode the
+editors check. The rendered tag chips are verified afterwards; callers fall
+back to typing the tags that did not show up.
+"""
+
+# arguments: tag input, list of tags
+_BULK_TAGS_JS = r"""
+var input = arguments[0], tags = arguments[1];
+var prototype = input.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+var setValue = Object.getOwnPropertyDescriptor(prototype, 'value').set;
+function press(type) {
+    var event = new KeyboardEvent(type, {key: 'Enter', code: 'Enter', bubbles: true, cancelable: true});
+    // keyCode/which are read-only in the constructor but still checked by older handlers
+    Object.defineProperty(event, 'keyCode', {get: function () { return 13; }});
+    Object.defineProperty(event, 'which', {get: function () { return 13; }});
+    input.dispatchEvent(event);
+}
+input.scrollIntoView({block: 'center'});
+input.focus();
+tags.forEach(function (tag) {
+    setValue.call(input, tag);
+    input.dispatchEvent(new Event('input', {bubbles: true}));
+    press('keydown');
+    press('keypress');
+    press('keyup');
+});
+"""
+
+# Tags that have no rendered chip yet. A chip is a text node reading 'tag' or '#tag' in the
+# scope: the closest ancestor matching arguments[2], else the input's third ancestor.
+# arguments: tag input, list of tags, scope selector (optional)
+_MISSING_TAG_CHIPS_JS = r"""
+var input = arguments[0], tags = arguments[1], scope = arguments[2] ? input.closest(arguments[2]) : null;
+if (!scope) {
+    scope = input;
+    for (var i = 0; i < 3 && scope.parentElement; i++) scope = scope.parentElement;
+}
+var seen = {};
+var walker = document.createTreeWalker(scope, NodeFilter.SHOW_TEXT);
+while (walker.nextNode()) {
+    seen[walker.currentNode.nodeValue.trim().replace(/^#/, '').toLowerCase()] = true;
+}
+return tags.filter(function (tag) { return !seen[tag.replace(/^#/, '').toLowerCase()]; });
+"""
+
+def enter_tags(driver, waits, tag_input, tags, scope_selector=None, timeout=3):
+    """
+    Enters all tags in one script and waits for their chips. Returns the tags whose
+    chip did not appear within timeout ([] when all are there).
+    """
+    if not tags:
+        return []
+    driver.execute_script(_BULK_TAGS_JS, tag_input, tags)
+    missing = list(tags)
+
+    def chips_rendered(driver):
+        nonlocal missing
+        missing = driver.execute_script(_MISSING_TAG_CHIPS_JS, tag_input, tags, scope_selector)
+        return not missing
+
+    waits.until(chips_rendered, timeout)
+    return missing
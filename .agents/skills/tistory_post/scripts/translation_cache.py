@@ -0,0 +1,85 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = os.path.join(".tmp", "translation_cache.json")
+DEFAULT_MAX_ENTRIES = 500
+
+class TranslationCache:
+    """
+    Disk-backed LRU cache of query translations, keyed by (model, text).
+
+    The whole cache is a single small JSON file (a list of entries ordered from
+    least to most recently used). When it grows past max_entries, the least
+    recently used entries are evicted on save.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _key(text, model):
+        return f"{model}\n{text}"
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable translation cache {self.path}: {e}")
+            return
+        for entry in data:
+            self._entries[self._key(entry["text"], entry["model"])] = entry
+
+    def get(self, text, model):
+        with self._lock:
+            key = self._key(text, model)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._dirty = True
+            self.hits += 1
+            return entry["translation"]
+
+    def put(self, text, model, translation):
+        with self._lock:
+            key = self._key(text, model)
+            self._entries[key] = {"text": text, "model": model, "translation": translation}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def missing(self, texts, model):
+        """Returns the texts (deduplicated, in order) that have no cached translation."""
+        with self._lock:
+            result = []
+            for text in texts:
+                if self._key(text, model) not in self._entries and text not in result:
+                    result.append(text)
+            return result
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(list(self._entries.values()), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
@@ -1,28 +1,407 @@
 import os
 import sys
-import time
 import re
+import argparse
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, NoAlertPresentException
 from dotenv import load_dotenv
 import pyperclip
+from document_manifest import load_manifest
+from keyword_extractor import extract_keywords
+from browser_waits import StepTimer, Waiter
+from tag_entry import enter_tags
+from chrome_driver import start_chrome
 
 # Load environment variables
 load_dotenv()
 
-def main():
-    if len(sys.argv) < 3:
-        print("Usage: py upload_to_tistory_selenium.py <result_folder_path> <BlogAlias>")
-        sys.exit(1)
+# One Chrome profile per alias keeps the Tistory/Kakao session (cookies, device trust) between runs
+PROFILE_ROOT = os.path.join(".tmp", "chrome_profiles")
+SESSION_PROBE_TIMEOUT = 30
+UPLOAD_TIMEOUT = 60
+
+# Basic (TinyMCE) editor is ready once its editable iframe body has content
+EDITOR_READY_JS = """
+return Array.prototype.some.call(document.querySelectorAll('iframe'), function (frame) {
+    try {
+        var body = frame.contentDocument && frame.contentDocument.body;
+        return !!body && body.isContentEditable && body.childElementCount > 0;
+    } catch (e) { return false; }
+});
+"""
+
+BATCH_UPLOAD_TIMEOUT_PER_IMAGE = 20
+
+# srcs of the images in the editor that already point to an uploaded (http) URL;
+# arguments[0]: only count images that finished loading
+UPLOADED_IMAGE_SRCS_JS = r"""
+var onlyLoaded = arguments[0], srcs = [];
+Array.prototype.forEach.call(document.querySelectorAll('iframe'), function (frame) {
+    try {
+        Array.prototype.forEach.call(frame.contentDocument.querySelectorAll('img'), function (img) {
+            var src = img.getAttribute('src') || '';
+            if (/^https?:/.test(src) && (!onlyLoaded || img.complete)) srcs.push(src);
+        });
+    } catch (e) {}
+});
+return srcs;
+"""
+
+# Collapses the selection to the end of the editor body, so a batch upload lands
+# after the content instead of replacing a selected placeholder
+CARET_TO_END_JS = r"""
+Array.prototype.some.call(document.querySelectorAll('iframe'), function (frame) {
+    try {
+        var doc = frame.contentDocument, body = doc && doc.body;
+        if (!body || !body.isContentEditable) return false;
+        var range = doc.createRange();
+        range.selectNodeContents(body);
+        range.collapse(false);
+        var selection = doc.getSelection();
+        selection.removeAllRanges();
+        selection.addRange(range);
+        return true;
+    } catch (e) { return false; }
+});
+"""
+
+# Shared by the placeholder scripts below: walks the top document and every same-origin
+# iframe (nested too) once; frame paths are iframe indexes ('' = top, '0', '0/1', ...)
+_EDITOR_JS_HELPERS = r"""
+function editorDocuments() {
+    var docs = [];
+    (function walk(doc, path) {
+        docs.push({doc: doc, path: path});
+        Array.prototype.forEach.call(doc.querySelectorAll('iframe'), function (frame, i) {
+            var child;
+            try { child = frame.contentDocument; } catch (e) { return; }
+            if (child && child.documentElement) walk(child, path ? path + '/' + i : String(i));
+        });
+    })(document, '');
+    return docs;
+}
+function basename(path) {
+    try { path = decodeURIComponent(path); } catch (e) {}
+    return path.replace(/[?#].*$/, '').split(/[\\/]/).pop();
+}
+function editorImages(uploaded) {
+    // Images inside the editable content: uploaded (http) ones or local-path placeholders
+    var found = [];
+    editorDocuments().forEach(function (entry) {
+        Array.prototype.forEach.call(entry.doc.querySelectorAll('img'), function (img, index) {
+            var src = img.getAttribute('src') || '';
+            if (!src || !(img.isContentEditable || entry.doc.designMode === 'on')) return;
+            if (/^https?:/i.test(src) === uploaded && !/^(data:|blob:|\/\/)/i.test(src)) {
+                found.push({img: img, name: basename(src), src: src, frame: entry.path, index: index});
+            }
+        });
+    });
+    return found;
+}
+function notifyEditor() {
+    var editor = window.tinymce && window.tinymce.activeEditor;
+    if (!editor) return;
+    if (editor.undoManager) editor.undoManager.add();
+    if (editor.setDirty) editor.setDirty(true);
+    if (editor.nodeChanged) editor.nodeChanged();
+}
+"""
+
+# Map of file name -> {frame, index, src} for every local-path placeholder image (first occurrence)
+LOCATE_PLACEHOLDERS_JS = _EDITOR_JS_HELPERS + r"""
+var located = {};
+editorImages(false).forEach(function (p) {
+    if (!(p.name in located)) located[p.name] = {frame: p.frame, index: p.index, src: p.src};
+});
+return located;
+"""
+
+# Scrolls to the placeholder named arguments[0] and selects it, so an upload lands there
+SELECT_PLACEHOLDER_JS = _EDITOR_JS_HELPERS + r"""
+var name = arguments[0];
+var match = editorImages(false).filter(function (p) { return p.name === name; })[0];
+if (!match) return false;
+var img = match.img, doc = img.ownerDocument;
+img.scrollIntoView({block: 'center'});
+var range = doc.createRange();
+range.selectNode(img);
+var selection = doc.getSelection();
+selection.removeAllRanges();
+selection.addRange(range);
+return true;
+"""
+
+# Removes the placeholders named in arguments[0] (and paragraphs left empty); returns how many
+REMOVE_PLACEHOLDERS_JS = _EDITOR_JS_HELPERS + r"""
+var names = arguments[0], removed = 0;
+editorImages(false).forEach(function (p) {
+    if (names.indexOf(p.name) < 0) return;
+    var parent = p.img.parentNode;
+    parent.removeChild(p.img);
+    removed++;
+    if (parent.tagName === 'P' && !parent.childNodes.length) parent.parentNode.removeChild(parent);
+});
+if (removed) notifyEditor();
+return removed;
+"""
+
+# One pass over the editor after a batch upload: every newly uploaded image (src not in
+# arguments[0]) is moved onto the local placeholder named by its data-filename, which is
+# removed. New images without a matching data-filename are deleted rather than guessed,
+# so the one-by-one fallback does not add them a second time.
+# arguments[1]: uploaded file names in document order. Returns {placed, missing, discarded}.
+PLACE_UPLOADED_IMAGES_JS = _EDITOR_JS_HELPERS + r"""
+var known = {}, filenames = arguments[1];
+arguments[0].forEach(function (src) { known[src] = true; });
+var uploaded = editorImages(true).filter(function (u) { return !known[u.src]; }).map(function (u) { return u.img; });
+var placeholders = editorImages(false).filter(function (p) { return filenames.indexOf(p.name) >= 0; }).map(function (p) { return p.img; });
+function uploadedName(img) {
+    var holder = img.closest('[data-filename]');
+    return holder ? holder.getAttribute('data-filename') : '';
+}
+function move(img, placeholder) {
+    var block = img.closest('figure') || img;
+    var parent = placeholder.parentNode;
+    // A paragraph holding nothing but the placeholder is replaced as a whole
+    var target = parent.tagName === 'P' && parent.childNodes.length === 1 ? parent : placeholder;
+    target.parentNode.replaceChild(block, target);
+    return basename(placeholder.getAttribute('src'));
+}
+function discard(img) {
+    var block = img.closest('figure') || img;
+    var parent = block.parentNode;
+    parent.removeChild(block);
+    if (parent.tagName === 'P' && !parent.childNodes.length) parent.parentNode.removeChild(parent);
+}
+var placed = [], discarded = 0;
+uploaded.forEach(function (img) {
+    var name = uploadedName(img);
+    for (var i = 0; name && i < placeholders.length; i++) {
+        if (basename(placeholders[i].getAttribute('src')) === name) {
+            placed.push(move(img, placeholders.splice(i, 1)[0]));
+            return;
+        }
+    }
+    discard(img);
+    discarded++;
+});
+notifyEditor();
+return {placed: placed, discarded: discarded, missing: filenames.filter(function (name) { return placed.indexOf(name) < 0; })};
+"""
+
+# Replaces the whole HTML-mode editor content in one call and reports how it landed
+# (CodeMirror normalizes line endings to \n, so compare against the normalized draft)
+CODEMIRROR_SET_VALUE_JS = """
+var element = document.querySelector('.CodeMirror');
+if (!element || !element.CodeMirror) return null;
+var cm = element.CodeMirror;
+var html = arguments[0].replace(/\\r\\n?/g, '\\n');
+cm.setValue(html);
+if (cm.save) cm.save();
+cm.refresh();
+var value = cm.getValue();
+return {length: value.length, expected: html.length, identical: value === html};
+"""
+
+# Opens the category menu, clicks the item named arguments[0] (exact text first, then
+# contains) once the menu has rendered, and reports the label the button then shows.
+# Async: one round trip for the whole selection.
+SELECT_CATEGORY_JS = r"""
+var name = arguments[0], done = arguments[arguments.length - 1];
+var button = document.getElementById('category-btn');
+if (!button) { done({selected: false, label: null, reason: 'no #category-btn'}); return; }
+button.scrollIntoView({block: 'center'});
+button.click();
+var started = Date.now();
+(function poll() {
+    var items = Array.prototype.slice.call(document.querySelectorAll('#category-list .mce-menu-item'));
+    var label = function (item) { return (item.textContent || '').trim(); };
+    var item = items.filter(function (i) { return label(i) === name; })[0] ||
+               items.filter(function (i) { return label(i).indexOf(name) >= 0; })[0];
+    if (item) {
+        item.click();
+        setTimeout(function () {
+            var shown = (button.textContent || '').trim();
+            done({selected: shown.indexOf(name) >= 0, label: shown});
+        }, 50);
+    } else if (Date.now() - started > 3000) {
+        done({selected: false, label: (button.textContent || '').trim(), reason: items.length ? 'not in the list' : 'menu did not open'});
+    } else {
+        setTimeout(poll, 50);
+    }
+})();
+"""
+
+def inject_html(driver, html):
+    """
+    Sets the HTML editor content through the CodeMirror API (no clipboard). Returns
+    True once the editor holds exactly html, False if it differs, None if there is
+    no CodeMirror instance to talk to.
+    """
+    result = driver.execute_script(CODEMIRROR_SET_VALUE_JS, html)
+    if result is None:
+        return None
+    print(f"  Injected {result['length']:,} / {result['expected']:,} characters via CodeMirror.")
+    return bool(result["identical"])
+
+def open_image_input(driver):
+    """Opens Attach > Photo and returns the image file input (made interactable), or None."""
+    # Click 'Attach' to trigger DOM (User ID: mceu_0-open)
+    print("  Clicking 'Attach' button (#mceu_0-open)...")
+    try:
+        attach_btn = WebDriverWait(driver, 5).until(
+            EC.element_to_be_clickable((By.ID, "mceu_0-open"))
+        )
+        attach_btn.click()
+    except Exception as e:
+        print(f"  Attach button click failed: {e}")
+        # Continue anyway to try finding input
+
+    # Click 'Photo' menu item (User ID: attach-image)
+    print("  Clicking 'Photo' menu item (div#attach-image)...")
+    try:
+        # Target the DIV explicitly
+        photo_btn = WebDriverWait(driver, 3).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "div#attach-image"))
+        )
+        photo_btn.click()
+    except Exception as e:
+        print(f"  Photo button click failed: {e}")
+
+    # Direct Input targeting
+    print("  Targeting input#attach-image (Correcting ID conflict)...")
+    try:
+        # STRICTLY target the INPUT, not the DIV
+        file_input = WebDriverWait(driver, 5).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "input#attach-image"))
+        )
+    except Exception as e:
+        print(f"  Upload input target failed: {e}")
+        # Fallback: Generic file input
+        try:
+            file_input = driver.find_element(By.CSS_SELECTOR, "input[type='file']")
+            print("  Fallback input found.")
+        except NoSuchElementException:
+            return None
+
+    # Make it visible so we can interact
+    driver.execute_script("arguments[0].style.display = 'block'; arguments[0].style.visibility = 'visible';", file_input)
+    return file_input
+
+def upload_images_batch(driver, waits, image_paths):
+    """
+    Sends all images to the attach input in one multi-file submission, waits until the
+    editor shows them all as uploaded and moves each onto its placeholder in one JS pass.
+    Returns the file names that still need the one-by-one upload ([] if all were placed).
+    """
+    filenames = [os.path.basename(path) for path in image_paths]
+    known = driver.execute_script(UPLOADED_IMAGE_SRCS_JS, False)
+    driver.execute_script(CARET_TO_END_JS)
+
+    file_input = open_image_input(driver)
+    if file_input is None or file_input.get_attribute("multiple") is None:
+        print("  Image input does not take multiple files. Falling back to one-by-one upload.")
+        return filenames
+    file_input.send_keys("\n".join(image_paths))
+    print(f"  {len(image_paths)} files sent in one submission.")
+
+    expected = len(known) + len(image_paths)
+    timeout = BATCH_UPLOAD_TIMEOUT_PER_IMAGE * len(image_paths)
+    print(f"  Waiting for the uploads (up to {timeout}s)...")
+    if waits.until(lambda d: len(d.execute_script(UPLOADED_IMAGE_SRCS_JS, True)) >= expected, timeout):
+        print("  All uploads complete.")
+    else:
+        # Let uploads still in flight land now, so none turn up after the placement pass
+        print("  Warning: Not every upload finished within the timeout. Waiting for pending requests...")
+        waits.network_idle(quiet=1, timeout=BATCH_UPLOAD_TIMEOUT_PER_IMAGE)
+
+    result = driver.execute_script(PLACE_UPLOADED_IMAGES_JS, known, filenames)
+    print(f"  Placed {len(result['placed'])}/{len(filenames)} images onto their placeholders.")
+    if result["discarded"]:
+        print(f"  Removed {result['discarded']} uploaded image(s) without a matching file name; they are uploaded again one by one.")
+    return result["missing"]
+
+def logged_in_page(driver):
+    """WebDriverWait condition: back on Tistory after the Kakao login (not on a login page)."""
+    url = driver.current_url
+    return "tistory.com" in url and "/auth/login" not in url and "kakao.com" not in url
+
+def profile_dir(blog_alias):
+    return os.path.abspath(os.path.join(PROFILE_ROOT, f"tistory_{blog_alias.lower()}"))
+
+def write_page_state(driver):
+    """
+    WebDriverWait condition for the write page: 'editor' once the title input is there,
+    'login' if Tistory redirected to the login page (session expired), else False.
+    """
+    try:
+        # "Continue the saved draft?" confirm blocks every other call while open
+        driver.switch_to.alert.dismiss()
+    except NoAlertPresentException:
+        pass
+    url = driver.current_url
+    if "/auth/login" in url or "accounts.kakao.com" in url:
+        return "login"
+    if driver.find_elements(By.ID, "post-title-inp"):
+        return "editor"
+    return False
+
+def login_with_kakao(driver, waits, tistory_id, tistory_pw):
+    login_url = "https://www.tistory.com/auth/login"
+    print(f"Navigating to {login_url}...")
+    driver.get(login_url)
+
+    # Click 'Kakao Login' button
+    try:
+        kakao_login_btn = WebDriverWait(driver, 5).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, ".btn_login.link_kakao_id"))
+        )
+        kakao_login_btn.click()
+    except TimeoutException:
+        print("Kakao login button not found or already on login page.")
+
+    # Kakao Login Form
+    print("Waiting for Kakao Login page...")
+    try:
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.NAME, "loginId"))
+        )
+
+        id_input = driver.find_element(By.NAME, "loginId")
+        id_input.clear()
+        id_input.send_keys(tistory_id)
+        id_input.send_keys(Keys.ENTER)
 
-    result_folder = sys.argv[1]
-    blog_alias = sys.argv[2].upper()
+        pw_input = WebDriverWait(driver, 10).until(
+            EC.visibility_of_element_located((By.NAME, "password"))
+        )
+        pw_input.clear()
+        pw_input.send_keys(tistory_pw)
+        pw_input.send_keys(Keys.ENTER)
+    except TimeoutException:
+         print("Login elements not found. Check if already logged in.")
+
+    # Wait for Login Completion
+    print("Waiting for login to complete... (Please handle 2FA/Captcha manually if needed)")
+    WebDriverWait(driver, 120).until(logged_in_page)
+    print("Login detected (no longer on login page). Waiting for final redirects to settle...")
+    waits.network_idle(quiet=1.0, timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload a blog post to Tistory (saved as private).")
+    parser.add_argument("result_folder", help="Result folder containing blog_post.html")
+    parser.add_argument("blog_alias", help="Blog alias (TISTORY_ALIAS_<n> in .env)")
+    parser.add_argument("--no-profile", action="store_true", help="Use a fresh browser session (always log in) instead of the saved per-alias profile")
+    parser.add_argument("--no-batch", action="store_true", help="Upload images one at a time instead of in one multi-file submission")
+    parser.add_argument("--headless", action="store_true", help="Run Chrome without a window (needs a saved session: 2FA/captcha cannot be handled)")
+    args = parser.parse_args()
+
+    result_folder = args.result_folder
+    blog_alias = args.blog_alias.upper()
     html_file = os.path.join(result_folder, "blog_post.html")
     hashtag_file = os.path.join(result_folder, "hashtags.txt")
 
@@ -34,6 +413,7 @@ def main():
     print(f"Reading content from {html_file}...")
     with open(html_file, "r", encoding="utf-8") as f:
         content_html = f.read()
+    manifest = load_manifest(html_file)
 
     hashtags = ""
     # Try reading from hashtags.txt
@@ -41,32 +421,15 @@ def main():
         with open(hashtag_file, "r", encoding="utf-8") as f:
             hashtags = f.read().strip().replace("#", "").replace(" ", ", ")
     else:
-        # Fallback: Extract from HTML
+        # Fallback: hashtag section(s) of the HTML, collected by the manifest
         print("hashtags.txt not found. Extracting from HTML...")
-        # Use findall because there might be an empty placeholder div first
-        matches = re.findall(r'<div class="hashtag-section"[^>]*>(.*?)</div>', content_html, re.DOTALL)
-        tags_list = []
-        for raw_text in matches:
-            cleaned = re.sub(r'<[^>]+>', '', raw_text).strip()
-            if cleaned:
-                # Split by space, remove #
-                for t in cleaned.split():
-                    t_clean = t.replace("#", "").strip()
-                    if t_clean:
-                        tags_list.append(t_clean)
-        
-        if tags_list:
-             # Remove duplicates while preserving order
-             seen = set()
-             deduped = []
-             for t in tags_list:
-                 if t not in seen:
-                     deduped.append(t)
-                     seen.add(t)
-             hashtags = ", ".join(deduped)
+        if manifest["hashtags"]:
+             hashtags = ", ".join(manifest["hashtags"])
              print(f"Extracted tags: {hashtags}")
         else:
-             print("No tags found in HTML.")
+             # Offline keyword extraction, so the post never goes up without tags
+             hashtags = ", ".join(keyword for keyword, _ in extract_keywords(manifest))
+             print(f"No tags found in HTML. Extracted keywords instead: {hashtags}")
 
     # Try reading from category.txt
     category_file = os.path.join(result_folder, "category.txt")
@@ -93,73 +456,56 @@ def main():
         print(f"Error: Could not find complete credentials for alias '{blog_alias}' in .env")
         sys.exit(1)
 
+    timer = StepTimer()
+    timer.start("browser start")
     print("Starting Chrome Driver...")
-    options = webdriver.ChromeOptions()
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--start-maximized")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36")
-
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    user_data_dir = None
+    if not args.no_profile:
+        user_data_dir = profile_dir(blog_alias)
+        os.makedirs(user_data_dir, exist_ok=True)
+        print(f"Using browser profile: {user_data_dir}")
+
+    driver = start_chrome(
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36",
+        headless=args.headless,
+        user_data_dir=user_data_dir,
+    )
+    waits = Waiter(driver, timer)
     
     try:
-        # 3. Login
-        login_url = "https://www.tistory.com/auth/login"
-        print(f"Navigating to {login_url}...")
-        driver.get(login_url)
-        
-        # Click 'Kakao Login' button
+        write_url = f"https://{blog_name}.tistory.com/manage/newpost"
+
+        # 3. Reuse the saved session: the write page either opens the editor or redirects to login
+        session_valid = False
+        if not args.no_profile:
+            timer.start("session probe")
+            print(f"Checking saved session on {write_url}...")
+            driver.get(write_url)
+            session_valid = waits.until(write_page_state, SESSION_PROBE_TIMEOUT) == "editor"
+            print("Session valid. Skipping login." if session_valid else "Session expired or missing. Logging in...")
+
+        if not session_valid:
+            # 4. Login
+            timer.start("login", replaced_sleep=31)
+            login_with_kakao(driver, waits, tistory_id, tistory_pw)
+
+            # 5. Go to Write Page
+            print(f"Navigating to write page: {write_url}...")
+            driver.get(write_url)
+
+        # Editor is up once the title input exists; the "continue draft?" confirm is
+        # dismissed on the way and once more if it opens while the editor loads
+        timer.start("write page", replaced_sleep=6)
+        if waits.until(write_page_state, 30) == "editor":
+            waits.network_idle(timeout=10)
         try:
-            kakao_login_btn = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, ".btn_login.link_kakao_id"))
-            )
-            kakao_login_btn.click()
-        except TimeoutException:
-            print("Kakao login button not found or already on login page.")
-
-        # Kakao Login Form
-        print("Waiting for Kakao Login page...")
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.NAME, "loginId"))
-            )
-            
-            id_input = driver.find_element(By.NAME, "loginId")
-            id_input.clear()
-            id_input.send_keys(tistory_id)
-            id_input.send_keys(Keys.ENTER)
-            
-            time.sleep(1)
-
-            pw_input = driver.find_element(By.NAME, "password")
-            pw_input.clear()
-            pw_input.send_keys(tistory_pw)
-            pw_input.send_keys(Keys.ENTER)
-        except TimeoutException:
-             print("Login elements not found. Check if already logged in.")
-
-        # 4. Wait for Login Completion
-        print("Waiting for login to complete... (Please handle 2FA/Captcha manually if needed)")
-        WebDriverWait(driver, 120).until(
-            EC.url_contains("tistory.com")
-        )
-        print("Login detected (no longer on login page). Waiting 30 seconds for any final redirects or manual steps...")
-        time.sleep(30)
-
-        # 5. Go to Write Page
-        write_url = f"https://{blog_name}.tistory.com/manage/post"
-        print(f"Navigating to write page: {write_url}...")
-        driver.get(write_url)
-        
-        try:
-            WebDriverWait(driver, 6).until(EC.alert_is_present())
             driver.switch_to.alert.dismiss()
-        except TimeoutException:
+        except NoAlertPresentException:
             pass
 
         try:
             # Title input is #post-title-inp (textarea)
-            title_input = WebDriverWait(driver, 30).until(
+            title_input = WebDriverWait(driver, 5).until(
                 EC.presence_of_element_located((By.ID, "post-title-inp"))
             )
         except TimeoutException:
@@ -186,17 +532,16 @@ def main():
                 element.send_keys(text)
 
         # Set Title
-        title_match = re.search(r'<h1>(.*?)</h1>', content_html)
-        title = title_match.group(1) if title_match else "AI Generated Blog Post"
+        timer.start("title", replaced_sleep=3.5)
+        title = manifest["title"] or "AI Generated Blog Post"
         title = "".join(c for c in title if ord(c) <= 0xFFFF)
         
         print(f"Setting title: {title}")
         try:
             # Scroll to title and click to focus
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", title_input)
-            time.sleep(0.5)
+            WebDriverWait(driver, 5).until(EC.element_to_be_clickable(title_input))
             title_input.click()
-            time.sleep(0.5)
             
             # Use ActionChains to ensure the editor's internal state updates
             # Select all and type/paste
@@ -204,35 +549,34 @@ def main():
             actions.click(title_input)
             actions.key_down(Keys.CONTROL).send_keys("a").key_up(Keys.CONTROL).perform()
             actions.send_keys(Keys.BACKSPACE).perform()
-            time.sleep(0.5)
             
-            # Using safe_send_keys as a backup, but primary is typing or pasting
-            pyperclip.copy(title)
-            actions.key_down(Keys.CONTROL).send_keys("v").key_up(Keys.CONTROL).perform()
-            actions.perform()
+            # Type it (non-BMP characters are already stripped); safe_send_keys is the backup
+            title_input.send_keys(title)
             
-            # Final check/force
-            current_val = title_input.get_attribute("value")
+            # Final check/force: give the typing a moment to land before forcing the value
+            current_val = waits.until(lambda d: title_input.get_attribute("value"), 2)
             if not current_val:
                 safe_send_keys(title_input, title)
                 
             print(f"  Title set to: {title_input.get_attribute('value')[:20]}...")
         except Exception as e:
             print(f"  Warning: Title setting error: {e}")
-        time.sleep(2)
 
         # ----------------------------------------------------------------------
         # INITIAL CONTENT INJECTION (DRAFT)
         # ----------------------------------------------------------------------
+        timer.start("html injection", replaced_sleep=7)
         print("Injecting draft HTML content...")
         
-        # Robust Switch to HTML Mode
+        def code_mirror_visible(driver):
+            cms = driver.find_elements(By.CSS_SELECTOR, ".CodeMirror")
+            return bool(cms) and cms[0].is_displayed()
+
         # Robust Switch to HTML Mode
         def switch_to_html_mode(driver):
             try:
                 # Check if already in HTML mode (CodeMirror visible)
-                cms = driver.find_elements(By.CSS_SELECTOR, ".CodeMirror")
-                if cms and cms[0].is_displayed():
+                if code_mirror_visible(driver):
                     print("Already in HTML mode.")
                     return True
 
@@ -241,7 +585,6 @@ def main():
                     # Method 1: UI Clicks
                     mode_btn = WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.ID, "editor-mode-layer-btn-open")))
                     mode_btn.click()
-                    time.sleep(0.5)
                     
                     try:
                         # Try finding by text "HTML"
@@ -260,12 +603,7 @@ def main():
                     driver.execute_script("tistory.editor.ChangeMode.toHtml();")
 
                 # Verify
-                time.sleep(2)
-                cms = driver.find_elements(By.CSS_SELECTOR, ".CodeMirror")
-                if cms and cms[0].is_displayed():
-                    return True
-                else:
-                    return False
+                return bool(waits.until(code_mirror_visible, 10))
             except Exception as e:
                 print(f"Error switching to HTML mode: {e}")
                 return False
@@ -273,22 +611,28 @@ def main():
         if not switch_to_html_mode(driver):
             print("Retry switching to HTML mode (JS Force)...")
             driver.execute_script("try { tistory.editor.ChangeMode.toHtml(); } catch(e) { console.log(e); }")
-            time.sleep(2)
-
-        time.sleep(1)
-        # Paste Draft
-        pyperclip.copy(content_html)
-        actions = webdriver.ActionChains(driver)
-        # Focus Editor reliably
-        try:
-            print("Focusing editor...")
-            driver.find_element(By.CSS_SELECTOR, ".CodeMirror").click()
-        except Exception as e:
-             print(f"Focus warning: {e}")
+            waits.until(code_mirror_visible, 10)
+
+        # Inject Draft: straight into the CodeMirror instance, clipboard paste only as a fallback
+        injected = inject_html(driver, content_html)
+        if injected is False:
+            print("  Warning: Editor content differs from the draft after injection.")
+        elif injected is None:
+            print("  CodeMirror API not available. Falling back to clipboard paste...")
+            pyperclip.copy(content_html)
+            actions = webdriver.ActionChains(driver)
+            # Focus Editor reliably
+            try:
+                print("Focusing editor...")
+                driver.find_element(By.CSS_SELECTOR, ".CodeMirror").click()
+            except Exception as e:
+                 print(f"Focus warning: {e}")
 
-        time.sleep(0.5)
-        actions.key_down(Keys.CONTROL).send_keys("v").key_up(Keys.CONTROL).perform()
-        time.sleep(3)
+            actions.key_down(Keys.CONTROL).send_keys("v").key_up(Keys.CONTROL).perform()
+            # Pasted once CodeMirror holds (nearly) the whole draft; it normalizes line endings
+            expected_length = len(content_html.replace("\r\n", "\n")) * 0.95
+            if not waits.js("var cm = document.querySelector('.CodeMirror'); return !!cm && !!cm.CodeMirror && cm.CodeMirror.getValue().length >= arguments[0];", expected_length, timeout=15):
+                print("  Warning: Editor content shorter than the draft after paste.")
 
         # Helper to switch to Basic Mode
         def switch_to_basic_mode(driver):
@@ -309,7 +653,6 @@ def main():
                     )
                 
                 mode_btn.click()
-                time.sleep(0.5)
                 
                 # 2. Click Basic Mode (ID: editor-mode-kakao-tistory)
                 print("  >> Clicking 'Basic Mode' (editor-mode-kakao-tistory)...")
@@ -317,20 +660,26 @@ def main():
                     EC.element_to_be_clickable((By.ID, "editor-mode-kakao-tistory"))
                 )
                 basic_btn.click()
-                    
-                time.sleep(1)
                 
                 # Handle potential alert (e.g., "Content may be modified...")
                 print("  >> Waiting for mode switch alert...")
                 try: 
                     # Tistory often shows a native confirm: "Writing mode... changes..."
-                    WebDriverWait(driver, 5).until(EC.alert_is_present())
-                    alert = driver.switch_to.alert
-                    print(f"  >> Alert detected: {alert.text}")
-                    alert.accept()
-                    print("  >> Alert accepted.")
-                except TimeoutException:
-                    print("  >> No alert appeared within 5s.")
+                    # Stop waiting as soon as either the confirm or the basic editor shows up
+                    def alert_or_editor(driver):
+                        try:
+                            return driver.switch_to.alert
+                        except NoAlertPresentException:
+                            return not code_mirror_visible(driver) and driver.execute_script(EDITOR_READY_JS)
+                    alert = waits.until(alert_or_editor, 5)
+                    if alert is True:
+                        print("  >> Basic editor ready, no alert.")
+                    elif alert:
+                        print(f"  >> Alert detected: {alert.text}")
+                        alert.accept()
+                        print("  >> Alert accepted.")
+                    else:
+                        print("  >> No alert appeared within 5s.")
                 except Exception as e:
                     print(f"  >> Verified alert interaction failed: {e}")
                 
@@ -348,20 +697,21 @@ def main():
         # ----------------------------------------------------------------------
         # SWITCH TO BASIC MODE FOR IN-PLACE UPLOAD
         # ----------------------------------------------------------------------
+        timer.start("basic mode", replaced_sleep=8.5)
         if not switch_to_basic_mode(driver):
             print("Failed to switch to Basic Mode. Aborting upload loop.")
         
-        time.sleep(2)
+        if not waits.js(EDITOR_READY_JS, timeout=10):
+            print("Warning: Basic editor not ready after 10s.")
+        waits.dom_idle()
 
         # ----------------------------------------------------------------------
         # IMAGE UPLOAD PROCESS (In-Place Replacement)
         print("\nScanning for local images to replace...")
         
-        # Regex to capture content of src="..." avoiding http/https
-        # We capture anything ending in image extensions, then filter.
-        # Modified to be slightly more permissive but still filter out http
+        # Image srcs come from the manifest; keep the ones ending in image extensions
         print(f"DEBUG: Content HTML length: {len(content_html)}")
-        raw_matches = re.findall(r'src=["\']([^"\']+\.(?:png|jpg|jpeg|gif))["\']', content_html, re.IGNORECASE)
+        raw_matches = [img["src"] for img in manifest["images"] if img["src"] and re.search(r'\.(?:png|jpg|jpeg|gif|webp)$', img["src"], re.IGNORECASE)]
         print(f"DEBUG: Initial raw matches: {raw_matches}")
         
         unique_images = []
@@ -374,14 +724,15 @@ def main():
         
         print(f"DEBUG: Unique images to process: {unique_images}")
         
+        timer.start("images", replaced_sleep=9 * len(unique_images) + 2)
         if unique_images:
             print(f"Found {len(unique_images)} images to replace: {unique_images}")
             
+            # Handle relative paths vs absolute paths
+            # Ensure result_folder is absolute
+            abs_result_folder = os.path.abspath(result_folder)
+            local_images = []
             for local_path in unique_images:
-                # Handle relative paths vs absolute paths
-                # Ensure result_folder is absolute
-                abs_result_folder = os.path.abspath(result_folder)
-                
                 if os.path.isabs(local_path):
                     abs_path = local_path
                 else:
@@ -392,181 +743,63 @@ def main():
                 if not os.path.exists(abs_path):
                     print(f"  Warning: File not found locally: {abs_path}")
                     continue
-                    
+                local_images.append((local_path, abs_path))
+
+            # All local-path images in the editor (document + same-origin iframes), in one call
+            placeholders = driver.execute_script(LOCATE_PLACEHOLDERS_JS)
+            print(f"Located {len(placeholders)} placeholder(s) in the editor:")
+            for name, location in placeholders.items():
+                print(f"  {name}: frame '{location['frame']}', img #{location['index']} ({location['src']})")
+
+            # Batch mode: every image in one multi-file upload, then one JS pass puts them in place
+            if len(local_images) > 1 and not args.no_batch:
+                print(f"\nBatch uploading {len(local_images)} images...")
+                remaining = upload_images_batch(driver, waits, [abs_path for _, abs_path in local_images])
+                local_images = [(local_path, abs_path) for local_path, abs_path in local_images if os.path.basename(abs_path) in remaining]
+                if local_images:
+                    print(f"  {len(local_images)} image(s) left for one-by-one upload.")
+
+            replaced = []
+            for local_path, abs_path in local_images:
                 filename = os.path.basename(local_path)
                 print(f"\nProcessing: {filename}")
                 
                 try:
-                    # 1. Find the placeholder image in the editor (Basic Mode)
-                    # Use JS to find img with matching src substring (since formatting might differ)
-                    # We escape backslashes for JS string
-                    js_path_search = local_path.replace("\\", "\\\\")
-                    
-                    placeholder = None
-                    try:
-                        # Try exact match first
-                        placeholder = driver.find_element(By.CSS_SELECTOR, f"img[src*='{filename}']")
-                    except:
-                        # Fallback to any broken image if filename match fails?
-                        # Let's try to focus by clicking the 'broken image' icon if evident
-                        print("  Could not find specific placeholder img by filename. Checking for any local-path img...")
-                        imgs = driver.find_elements(By.TAG_NAME, "img")
-                        
-                        # Debug: Print all images found
-                        print(f"  DEBUG: Found {len(imgs)} images in editor.")
-                        for i, img in enumerate(imgs):
-                             try:
-                                 src = img.get_attribute("src")
-                                 print(f"    [Img {i}] src: {src}")
-                             except:
-                                 print(f"    [Img {i}] src: (error getting src)")
-
-                        for img in imgs:
-                            src = img.get_attribute("src")
-                            if not src: continue
-                            
-                            # Check if filename is in src (This handles relative paths resolved to http)
-                            if filename in src:
-                                print(f"  DEBUG: Found candidate img by filename match: {src}")
-                                placeholder = img
-                                break
-                            
-                            # Old fallback: Check if src is a local file path pattern
-                            if "file:///" in src or "c:" in src.lower():
-                                print(f"  DEBUG: Found candidate img by local path pattern: {src}")
-                                placeholder = img
-                                break
-                    
-                    # 1. Find the placeholder image (Check Iframe first)
-                    print("  Searching for placeholder image...")
-                    placeholder = None
-                    
-                    # Store main handle
-                    main_window = driver.current_window_handle
-                    
-                    # Try finding in main content
-                    try:
-                        placeholder = driver.find_element(By.CSS_SELECTOR, f"img[src*='{filename}']")
-                        print("    Found in main document.")
-                    except:
-                        # Try searching IFRAMEs
-                        iframes = driver.find_elements(By.TAG_NAME, "iframe")
-                        print(f"    Not in main. Checking {len(iframes)} iframes...")
-                        for i, iframe in enumerate(iframes):
-                            try:
-                                driver.switch_to.frame(iframe)
-                                try:
-                                    placeholder = driver.find_element(By.CSS_SELECTOR, f"img[src*='{filename}']")
-                                    print(f"    Found in iframe index {i}.")
-                                    
-                                    # Focus/Select it using JS (More robust than click)
-                                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", placeholder)
-                                    time.sleep(0.5)
-                                    
-                                    # Create specific selection range on the image
-                                    driver.execute_script("""
-                                        var img = arguments[0];
-                                        var range = document.createRange();
-                                        range.selectNode(img);
-                                        var sel = window.getSelection();
-                                        sel.removeAllRanges();
-                                        sel.addRange(range);
-                                    """, placeholder)
-                                    print("    Forced JS selection on image.")
-                                    time.sleep(0.5)
-                                    
-                                    break # Keep in this frame to delete? No, need to go back for toolbar.
-                                    # We will delete it later.
-                                except:
-                                    driver.switch_to.default_content()
-                            except:
-                                driver.switch_to.default_content()
-                        
-                        driver.switch_to.default_content()
-
-                    if not placeholder:
+                    # 1. Select the placeholder (live lookup by file name, one call), so the upload lands on it
+                    placeholder = filename in placeholders and driver.execute_script(SELECT_PLACEHOLDER_JS, filename)
+                    if placeholder:
+                        print("  Placeholder selected.")
+                    else:
                         print("  Placeholder not found. Uploading at current cursor position.")
 
-                    # 2. Click 'Attach' to trigger DOM (User ID: mceu_0-open)
-                    print("  Clicking 'Attach' button (#mceu_0-open)...")
-                    try:
-                        attach_btn = WebDriverWait(driver, 5).until(
-                            EC.element_to_be_clickable((By.ID, "mceu_0-open"))
-                        )
-                        attach_btn.click()
-                        time.sleep(1)
-                    except Exception as e:
-                        print(f"  Attach button click failed: {e}") 
-                        # Continue anyway to try finding input
-
-                    # 3. Click 'Photo' menu item (User ID: attach-image)
-                    # User says: "Then click Photo in the floating menu"
-                    print("  Clicking 'Photo' menu item (div#attach-image)...")
-                    try:
-                         # Target the DIV explicitly
-                         photo_btn = WebDriverWait(driver, 3).until(
-                             EC.element_to_be_clickable((By.CSS_SELECTOR, "div#attach-image"))
-                         )
-                         photo_btn.click()
-                    except Exception as e:
-                         print(f"  Photo button click failed: {e}")
-
-                    time.sleep(1)
-
-                    # 4. Direct Input targeting
-                    print("  Targeting input#attach-image (Correcting ID conflict)...")
-                    try:
-                         # STRICTLY target the INPUT, not the DIV
-                         file_input = WebDriverWait(driver, 5).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, "input#attach-image"))
-                        )
-                         
-                         # Make it visible so we can interact
-                         driver.execute_script("arguments[0].style.display = 'block'; arguments[0].style.visibility = 'visible';", file_input)
-                         
-                         # Send keys
-                         file_input.send_keys(abs_path)
-                         print("  File sent to input#attach-image.")
-                         
-                    except Exception as e:
-                        print(f"  Upload input target failed: {e}")
-                        # Fallback: Generic file input
-                        try:
-                             file_input = driver.find_element(By.CSS_SELECTOR, "input[type='file']")
-                             file_input.send_keys(abs_path)
-                             print("  Fallback input success.")
-                        except:
-                             continue
+                    # Upload-complete marker: one more uploaded (http) image in the editor
+                    uploaded_before = len(driver.execute_script(UPLOADED_IMAGE_SRCS_JS, True))
 
-                    # 5. Wait for upload to complete
+                    # 2.-4. Attach > Photo > file input
+                    file_input = open_image_input(driver)
+                    if file_input is None:
+                        continue
+                    file_input.send_keys(abs_path)
+                    print("  File sent to the image input.")
 
                     # 5. Wait for upload to complete
-                    print("  Waiting for upload (6s)...")
-                    time.sleep(6)
-                    
-                    # 6. Remove the placeholder (Old Image)
+                    print(f"  Waiting for upload (up to {UPLOAD_TIMEOUT}s)...")
+                    if waits.until(lambda d: len(d.execute_script(UPLOADED_IMAGE_SRCS_JS, True)) > uploaded_before, UPLOAD_TIMEOUT):
+                        print("  Upload complete.")
+                    else:
+                        print("  Warning: Upload not confirmed within timeout.")
+
+                    # 6. The old placeholder is removed after the loop, together with the others
                     if placeholder:
-                        print("  Removing old placeholder...")
-                        try:
-                            # Must go back to iframe if needed
-                            iframes = driver.find_elements(By.TAG_NAME, "iframe")
-                            for iframe in iframes:
-                                driver.switch_to.frame(iframe)
-                                try:
-                                    ph = driver.find_element(By.CSS_SELECTOR, f"img[src*='{filename}']")
-                                    driver.execute_script("arguments[0].remove();", ph)
-                                    print("    Removed in iframe.")
-                                    break
-                                except:
-                                    driver.switch_to.default_content()
-                            driver.switch_to.default_content()
-                        except:
-                            print("  Could not remove placeholder.")
-                            driver.switch_to.default_content()
+                        replaced.append(filename)
                             
                 except Exception as e:
                     print(f"  Error processing image {filename}: {e}")
 
+            if replaced:
+                removed = driver.execute_script(REMOVE_PLACEHOLDERS_JS, replaced)
+                print(f"Removed {removed} old placeholder(s).")
+
         else:
             print("No local images found in draft.")
 
@@ -574,57 +807,65 @@ def main():
         # FINALIZATION (No Repaste Needed)
         # ----------------------------------------------------------------------
         print("\nUploads complete. Content should be ready.")
-        time.sleep(2)
+        waits.dom_idle()
         
         # Just ensure we are in Basic Mode (redundant check)
         try: driver.switch_to.alert.accept()
         except: pass
 
         # 7. Tags
+        tag_list = [tag.strip() for tag in hashtags.split(',') if tag.strip()]
+        timer.start("tags", replaced_sleep=0.5 + 0.4 * len(tag_list))
         print("Adding tags...")
         try:
             # Wait for tag input
             tag_input = WebDriverWait(driver, 5).until(
                 EC.presence_of_element_located((By.ID, "tagText"))
             )
-            # Scroll to it
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", tag_input)
-            time.sleep(0.5)
-            
+            # All tags in one script, then check the rendered chips
             tag_input.clear()
-            if hashtags:
-                for tag in hashtags.split(','):
-                    tag = tag.strip()
-                    if tag:
-                        tag_input.send_keys(tag)
-                        time.sleep(0.2)
-                        tag_input.send_keys(Keys.ENTER)
-                        time.sleep(0.2)
-            print("  Tags added.")
+            missing = enter_tags(driver, waits, tag_input, tag_list)
+            if missing:
+                print(f"  {len(missing)} tag chip(s) missing after bulk entry, typing them: {missing}")
+                driver.execute_script("arguments[0].value = '';", tag_input)
+            for tag in missing:
+                tag_input.send_keys(tag)
+                tag_input.send_keys(Keys.ENTER)
+                # The editor empties the input once the tag is registered
+                waits.until(lambda d: not tag_input.get_attribute("value"), 2)
+            print(f"  {len(tag_list)} tags added.")
         except TimeoutException:
             print("  Tag input (#tagText) not found within timeout.")
         except Exception as e:
              print(f"  Error adding tags: {e}")
 
         # 8. Publish
-        # 8. Publish
+        timer.start("category", replaced_sleep=1.5 if target_category else 0)
         print("Publishing (Private)...")
         try:
             # 1. Set Category (If provided) BEFORE clicking publish layer button
             if target_category:
                 print(f"  Setting category to: {target_category}...")
+                try:
+                    driver.set_script_timeout(10)
+                    result = driver.execute_async_script(SELECT_CATEGORY_JS, target_category)
+                except Exception as e:
+                    result = {"selected": False, "label": None, "reason": str(e)}
+                if result["selected"]:
+                    print(f"  Category '{target_category}' selected (shown: '{result['label']}').")
+                else:
+                    print(f"  Scripted category selection failed ({result.get('reason') or result['label']}). Trying the menu clicks...")
+            if target_category and not result["selected"]:
                 try:
                     # Depending on editor mode, we might need to scroll or JS click
                     cat_btn = WebDriverWait(driver, 5).until(
                         EC.element_to_be_clickable((By.ID, "category-btn"))
                     )
                     driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", cat_btn)
-                    time.sleep(0.5)
                     try:
                         cat_btn.click()
                     except:
                         driver.execute_script("arguments[0].click();", cat_btn)
-                    time.sleep(0.5)
                     
                     cat_item = WebDriverWait(driver, 5).until(
                         EC.element_to_be_clickable((By.XPATH, f"//div[@id='category-list']//div[contains(@class, 'mce-menu-item') and contains(., '{target_category}')]"))
@@ -632,16 +873,15 @@ def main():
                     # Click via JS fallback to avoid interception
                     driver.execute_script("arguments[0].click();", cat_item)
                     print(f"  Category '{target_category}' selected.")
-                    time.sleep(0.5)
                 except Exception as e:
                     print(f"  Warning: Could not select category '{target_category}'. Is it created in Tistory? Error: {e}")
 
             # 2. Click 'Complete' (완료)
+            timer.start("publish", replaced_sleep=12.5)
             publish_layer_btn = WebDriverWait(driver, 10).until(
                 EC.element_to_be_clickable((By.ID, "publish-layer-btn"))
             )
             driver.execute_script("arguments[0].click();", publish_layer_btn)
-            time.sleep(1.5)
             
             # 3. Select Private
             print("  Selecting 'Private' visibility...")
@@ -651,15 +891,13 @@ def main():
                 except: pass
                 
                 # Try label text
-                chk = WebDriverWait(driver, 3).until(
+                chk = WebDriverWait(driver, 10).until(
                     EC.element_to_be_clickable((By.XPATH, "//label[contains(., '비공개')]"))
                 )
                 chk.click()
             except Exception as e:
                 print(f"  Warning: Private selection issue: {e}")
 
-            time.sleep(1)
-
             # 3. Final Publish (Private Save)
             print("  Verifying title before final publish...")
             try:
@@ -670,10 +908,9 @@ def main():
                     print("  Title is missing! Attempting emergency title injection...")
                     driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", final_title_check)
                     final_title_check.click()
-                    time.sleep(0.5)
-                    pyperclip.copy(title if 'title' in locals() else "untitle")
-                    webdriver.ActionChains(driver).key_down(Keys.CONTROL).send_keys("v").key_up(Keys.CONTROL).perform()
-                    time.sleep(1)
+                    final_title_check.send_keys(title if 'title' in locals() else "untitle")
+                    if not waits.until(lambda d: final_title_check.get_attribute("value"), 3):
+                        safe_send_keys(final_title_check, title if 'title' in locals() else "untitle")
                 else:
                     print(f"  Title verified: {t_val[:20]}...")
             except:
@@ -686,8 +923,11 @@ def main():
             # Use JS click as it is more robust to overlays
             driver.execute_script("arguments[0].click();", final_save_btn)
             
-            print(">> POST PUBLISHED (Private)!")
-            time.sleep(5)
+            # Saving leaves the editor (redirect to the post list)
+            if waits.until(lambda d: "/manage/newpost" not in d.current_url, 15):
+                print(">> POST PUBLISHED (Private)!")
+            else:
+                print(">> Publish clicked, but the editor did not close within 15s. Check the post list.")
             
         except Exception as e:
             print(f"Failed to publish: {e}")
@@ -698,8 +938,8 @@ def main():
     except Exception as e:
         print(f"An error occurred: {e}")
     finally:
-        print("Script execution finished. Browser will close in 5 seconds.")
-        time.sleep(5)
+        timer.report()
+        print("Script execution finished. Closing browser.")
         try:
             driver.quit()
         except: